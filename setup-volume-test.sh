@@ -15,6 +15,7 @@ mkdir -p "$ACTIONS_DIR/touchscreen"
 if [ ! -f "$ACTIONS_DIR/streamdeck-daemon.py" ]; then
     echo "Installing daemon and scripts to $ACTIONS_DIR..."
     cp "$SCRIPT_DIR/streamdeck-daemon.py" "$ACTIONS_DIR/"
+    cp "$SCRIPT_DIR/streamdeck_gestures.py" "$ACTIONS_DIR/"
     cp "$SCRIPT_DIR/generate-volume-image.py" "$ACTIONS_DIR/"
     chmod +x "$ACTIONS_DIR/streamdeck-daemon.py"
     chmod +x "$ACTIONS_DIR/generate-volume-image.py"
@@ -9,17 +9,41 @@ Supports all gestures: swipes, long press, etc!
 """
 
 import os
+import re
 import sys
+import argparse
 import time
 import subprocess
 import logging
 import threading
+import weakref
 import json
+import math
+import select
+import errno
+import socket
+import struct
+import ctypes
+import ctypes.util
+import socketserver
+import hashlib
+import functools
+import heapq
+import itertools
+import shutil
+import urllib.request
+from collections import OrderedDict, deque, namedtuple
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from io import BytesIO
 
 from StreamDeck.DeviceManager import DeviceManager
-from PIL import Image, ImageDraw, ImageFont
+from StreamDeck.Devices.StreamDeck import DialEventType, TouchscreenEventType
+from StreamDeck.Transport.Transport import TransportError
+from PIL import Image, ImageChops, ImageDraw, ImageFont, ImageSequence, ImageStat
+
+from streamdeck_gestures import GestureRecognizer
 
 try:
     import cairosvg
@@ -28,6 +52,18 @@ except ImportError:
     cairosvg = None
     SVG_SUPPORT = False
 
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+try:
+    import Xlib.display
+    import Xlib.error
+    from Xlib import X
+except ImportError:
+    Xlib = None
+
 # Device profiles for all Stream Deck models
 DEVICE_PROFILES = {
     "Stream Deck Mini": {
@@ -96,6 +132,13 @@ DEVICE_PROFILES = {
     },
 }
 
+# JPEG settings for keys and the touchscreen of models without a calibrated
+# profile in encoder-profiles.json
+DEFAULT_ENCODER_SETTINGS = {
+    "key": {"quality": 95, "subsampling": None},
+    "touchscreen": {"quality": 95, "subsampling": None},
+}
+
 # Default profile for unknown devices
 DEFAULT_PROFILE = {
     "buttons": 15,
@@ -106,11 +149,91 @@ DEFAULT_PROFILE = {
     "pedals": 0,
 }
 
-def load_svg_image(svg_path, target_width, target_height, icon_color="#FFFFFF", bg_color="#000000"):
+FONT_BOLD = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+FONT_REGULAR = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+# Wrapped label text plus the metrics needed to draw it
+TextLayout = namedtuple("TextLayout", ["lines", "line_widths", "line_height"])
+
+
+@functools.lru_cache(maxsize=None)
+def get_font(font_path, size):
+    """Load a font face once per (path, size), falling back to PIL's default font"""
+    try:
+        return ImageFont.truetype(font_path, size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=1024)
+def layout_text(text, font_path, size, max_width, max_lines=2):
+    """Wrap or truncate text to fit max_width.
+
+    Each word is measured once and line widths are accumulated, so wrapping is
+    linear in the number of words. Results are memoized per input.
+    """
+    font = get_font(font_path, size)
+    space_width = font.getlength(' ')
+    lines = []
+    line_widths = []
+    current_line = []
+    current_width = 0
+
+    for word in text.split():
+        word_width = font.getlength(word)
+        test_width = current_width + space_width + word_width if current_line else word_width
+
+        if test_width <= max_width:
+            current_line.append(word)
+            current_width = test_width
+        else:
+            if current_line:
+                lines.append(' '.join(current_line))
+                line_widths.append(current_width)
+                current_line = [word]
+                current_width = word_width
+            else:
+                # Word too long, truncate it
+                truncated = word[:8] + '...'
+                lines.append(truncated)
+                line_widths.append(font.getlength(truncated))
+                current_line = []
+                current_width = 0
+
+    if current_line:
+        lines.append(' '.join(current_line))
+        line_widths.append(current_width)
+
+    return TextLayout(tuple(lines[:max_lines]), tuple(line_widths[:max_lines]), size + 5)
+
+
+# Image path -> (file identity, content digest), so unchanged files are not re-hashed
+_file_digests = {}
+
+
+def file_digest(path):
+    """Content hash of an image file, recomputed only when the file changes; None if missing"""
+    identity = file_identity(path)
+    if identity is None:
+        return None
+    cached = _file_digests.get(str(path))
+    if cached and cached[0] == identity:
+        return cached[1]
+
+    try:
+        digest = hashlib.sha1(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+    _file_digests[str(path)] = (identity, digest)
+    return digest
+
+
+def load_svg_image(svg_path, target_width, target_height, icon_color="#FFFFFF", bg_color="#000000", cache=None):
+    """Rasterize an SVG, reusing a cached raster from cache (a FrameCache) when possible"""
     if not SVG_SUPPORT or cairosvg is None:
         return None
     
-    try:
+    def rasterize():
         with open(svg_path, 'r') as f:
             svg_data = f.read()
         
@@ -125,11 +248,23 @@ def load_svg_image(svg_path, target_width, target_height, icon_color="#FFFFFF",
         )
         
         if png_data is None:
-            return None
+            raise ValueError("cairosvg returned no image")
         
         img = Image.open(BytesIO(png_data))
         img = img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-        return img.convert('RGB')
+        buf = BytesIO()
+        img.convert('RGB').save(buf, format='PNG')
+        return buf.getvalue()
+
+    try:
+        if cache is None:
+            png_data = rasterize()
+        else:
+            # get_or_create: the pre-warm thread and a render asking for the
+            # same raster share one cairosvg run
+            key = FrameCache.make_key(file_digest(svg_path), icon_color, bg_color, target_width, target_height)
+            png_data = cache.get_or_create(key, rasterize)
+        return Image.open(BytesIO(png_data)).convert('RGB')
     except Exception as e:
         logging.error(f"Error loading SVG {svg_path}: {e}")
         return None
@@ -168,74 +303,1731 @@ def resize_with_aspect_ratio(img, target_width, target_height):
 
     return background
 
+
+def to_native_format(img, image_format, quality=95, subsampling=None):
+    """Apply a device's rotation and flip, then encode in its native image format.
+
+    image_format is the dict returned by the StreamDeck library's
+    key_image_format()/touchscreen_image_format(). quality and subsampling
+    (0 = 4:4:4, 1 = 4:2:2, 2 = 4:2:0, None = Pillow's default) apply to JPEG.
+    """
+    size = tuple(image_format['size'])
+    if img.size != size:
+        img = img.resize(size, Image.Resampling.LANCZOS)
+
+    if image_format.get('rotation'):
+        img = img.rotate(image_format['rotation'], expand=True)
+
+    flip = image_format.get('flip') or (False, False)
+    if flip[0]:
+        img = img.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+    if flip[1]:
+        img = img.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+
+    buf = BytesIO()
+    if image_format['format'] == 'JPEG':
+        if subsampling is None:
+            img.save(buf, format='JPEG', quality=quality)
+        else:
+            img.save(buf, format='JPEG', quality=quality, subsampling=subsampling)
+    else:
+        img.save(buf, format=image_format['format'])
+    return buf.getvalue()
+
+
+def image_psnr(a, b):
+    """Peak signal-to-noise ratio between two images of the same size, in dB.
+
+    Computed in YCbCr with luma weighted 6:1:1 over the chroma channels, the
+    usual weighting for codec comparisons, since the eye (and chroma
+    subsampling) resolve colour far less finely than brightness.
+    """
+    diff = ImageChops.difference(a.convert('YCbCr'), b.convert('YCbCr'))
+    y, cb, cr = ImageStat.Stat(diff).sum2
+    mse = (6 * y + cb + cr) / (8 * a.width * a.height)
+    return float('inf') if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def encoder_samples(size):
+    """Typical frames for encoder calibration: a text label, an icon with a
+    label and a gradient, all of the given size"""
+    width, height = size
+    samples = []
+
+    label = Image.new('RGB', size, 'black')
+    draw = ImageDraw.Draw(label)
+    font = get_font(FONT_BOLD, max(10, min(width, height) // 5))
+    draw.text((width // 2, height // 2), "Build 42", fill='white', font=font, anchor='mm')
+    samples.append(label)
+
+    icon = Image.new('RGB', size, '#1e1e2e')
+    draw = ImageDraw.Draw(icon)
+    r = min(width, height) // 3
+    draw.ellipse((width // 2 - r, height // 3 - r // 2, width // 2 + r, height // 3 + r * 3 // 2), fill='#f44336')
+    draw.text((width // 2, height - 4), "Record", fill='#FFC107', font=font, anchor='mb')
+    samples.append(icon)
+
+    gradient = Image.linear_gradient('L').resize(size)
+    samples.append(Image.merge('RGB', (gradient, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), gradient.rotate(90))))
+    return samples
+
+
+def calibrate_encoder(image_format, qualities=(95, 90, 85, 80, 75, 70, 60), subsamplings=(0, 1, 2),
+                      min_psnr=40.0, rounds=5, default=(95, 2)):
+    """Measure payload size, encode time and fidelity of each JPEG setting for
+    one device image format and pick the smallest payload whose worst sample
+    stays above min_psnr (visually lossless) or at least as high as the
+    default (quality, subsampling) setting's.
+
+    The default is the ceiling: nothing with a larger payload than it is
+    chosen, so calibrating never makes repaints slower than the defaults.
+    Returns (chosen, default result, results): each result is a dict of
+    quality, subsampling, bytes (mean per frame), encode_ms (mean) and psnr
+    (worst sample).
+    """
+    samples = encoder_samples(tuple(image_format['size']))
+    lossless = dict(image_format, format='PNG')
+    references = [Image.open(BytesIO(to_native_format(img, lossless))) for img in samples]
+
+    results = []
+    for quality in qualities:
+        for subsampling in subsamplings:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                payloads = [to_native_format(img, image_format, quality, subsampling) for img in samples]
+            elapsed = time.perf_counter() - start
+            psnr = min(image_psnr(Image.open(BytesIO(payload)), reference)
+                       for payload, reference in zip(payloads, references))
+            results.append({
+                "quality": quality,
+                "subsampling": subsampling,
+                "bytes": round(sum(len(payload) for payload in payloads) / len(payloads)),
+                "encode_ms": round(elapsed * 1000 / (rounds * len(samples)), 3),
+                "psnr": round(psnr, 2),
+            })
+
+    baseline = next(r for r in results if (r['quality'], r['subsampling']) == tuple(default))
+    passing = [r for r in results
+               if r['bytes'] <= baseline['bytes'] and r['psnr'] >= min(min_psnr, baseline['psnr'])]
+    chosen = min(passing, key=lambda r: (r['bytes'], r['encode_ms']))
+    return chosen, baseline, results
+
+
+def file_identity(path):
+    """Cheap identity of a file for cache keys: (path, mtime_ns, size), or None if missing"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+def parse_profile_entry(entry, base_dir, default_position, default_fontsize):
+    """Validate one key/zone entry of the profile manifest into a complete dict.
+
+    Invalid positions and font sizes fall back to the defaults, as they do
+    for the -position.txt and -fontsize.txt files.
+    """
+    position = str(entry.get('position', default_position)).lower()
+    if position not in ['top', 'middle', 'bottom']:
+        position = default_position
+
+    try:
+        fontsize = int(entry.get('fontsize', default_fontsize))
+    except (TypeError, ValueError):
+        fontsize = default_fontsize
+    if not 10 <= fontsize <= 60:
+        fontsize = default_fontsize
+
+    icon = entry.get('icon')
+    label = entry.get('label')
+    return {
+        'label': str(label).strip() or None if label is not None else None,
+        'position': position,
+        'fontsize': fontsize,
+        'icon': (base_dir / icon).resolve() if icon else None,
+        'icon_color': entry.get('icon_color', '#FFFFFF'),
+        'background': entry.get('background'),
+        'color': entry.get('color'),
+    }
+
+
+def parse_dial_entry(entry):
+    """Validate one dial entry of the profile manifest into a complete dict.
+
+    coalesce_ms merges the ticks of a turn arriving within that window into
+    one cw/ccw action (0: an action per tick); acceleration is the exponent
+    applied to the merged tick count (1: none).
+    """
+    try:
+        coalesce_ms = min(max(int(entry.get('coalesce_ms', 0)), 0), 1000)
+    except (TypeError, ValueError):
+        coalesce_ms = 0
+    try:
+        acceleration = min(max(float(entry.get('acceleration', 1.0)), 1.0), 3.0)
+    except (TypeError, ValueError):
+        acceleration = 1.0
+    return {'coalesce_ms': coalesce_ms, 'acceleration': acceleration}
+
+
+def animation_candidates(images):
+    """Images that may be animated, GIFs first"""
+    return sorted((p for p in images if p.suffix.lower() in ('.gif', '.png')), key=lambda p: p.suffix.lower() != '.gif')
+
+
+# Everything needed to draw one key or touch zone, read from disk once
+TargetConfig = namedtuple('TargetConfig', [
+    'label', 'position', 'fontsize',
+    'images',      # candidate image paths, in load order
+    'sources',     # file_digest() of each image, for frame cache keys
+    'icon_color', 'background', 'color',
+    'has_script',  # touch zones: a touch-N.sh exists (changes the default colors)
+])
+
+
+class RenderConfig(namedtuple('RenderConfig', ['buttons', 'zones'])):
+    """Immutable snapshot of the render inputs of every key and touch zone.
+
+    A changed file produces a new snapshot via updated(); renders in flight
+    keep the snapshot they started with.
+    """
+
+    def __new__(cls, buttons=None, zones=None):
+        return super().__new__(cls, MappingProxyType(dict(buttons or {})), MappingProxyType(dict(zones or {})))
+
+    def updated(self, buttons=None, zones=None):
+        return RenderConfig({**self.buttons, **(buttons or {})}, {**self.zones, **(zones or {})})
+
+
+class FrameCache:
+    """Encoded image bytes keyed by their render inputs.
+
+    Entries live in an in-memory LRU. When a disk directory is given, entries
+    are also written there so they survive daemon restarts.
+    """
+
+    def __init__(self, max_entries=256, disk_dir=None, max_disk_entries=2048):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.disk_dir = disk_dir
+        self.frames = OrderedDict()
+        self.lock = threading.Lock()
+        self.creating = {}  # key -> Event set once the frame being created is stored
+        self.disk_lock = threading.Lock()
+        self.disk_entries = 0  # entries on disk, counted since the last prune
+        self.hits = 0
+        self.misses = 0
+
+        if self.disk_dir is not None:
+            try:
+                self.disk_dir.mkdir(parents=True, exist_ok=True)
+                self.prune_disk()
+            except OSError as e:
+                logging.warning(f"Frame cache disk tier disabled: {e}")
+                self.disk_dir = None
+
+    @staticmethod
+    def make_key(*parts):
+        """Hash render inputs (str/int/tuple/None values) into a cache key"""
+        return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+    def _remember(self, key, data):
+        with self.lock:
+            self.frames[key] = data
+            self.frames.move_to_end(key)
+            while len(self.frames) > self.max_entries:
+                self.frames.popitem(last=False)
+
+    def get(self, key):
+        """Return cached frame bytes, or None on a miss"""
+        with self.lock:
+            data = self.frames.get(key)
+            if data is not None:
+                self.frames.move_to_end(key)
+                self.hits += 1
+                return data
+
+        if self.disk_dir is not None:
+            try:
+                data = (self.disk_dir / key).read_bytes()
+            except OSError:
+                data = None
+            if data:
+                self._remember(key, data)
+                self.hits += 1
+                return data
+
+        self.misses += 1
+        return None
+
+    def put(self, key, data):
+        """Store frame bytes in memory and, if enabled, on disk"""
+        self._remember(key, data)
+
+        if self.disk_dir is not None:
+            path = self.disk_dir / key
+            tmp_path = self.disk_dir / f".{key}.tmp"
+            try:
+                is_new = not path.exists()
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logging.debug(f"Could not write frame cache entry: {e}")
+                return
+
+            # Rewritten images (widgets updating every second or two) get new
+            # keys, so the disk tier is pruned as it grows, not only at startup.
+            # Pruning leaves some headroom so it runs once per batch of writes.
+            if is_new:
+                with self.disk_lock:
+                    self.disk_entries += 1
+                    if self.disk_entries > self.max_disk_entries:
+                        try:
+                            self.prune_disk(keep=self.max_disk_entries * 7 // 8)
+                        except OSError as e:
+                            logging.debug(f"Could not prune frame cache: {e}")
+
+    def get_or_create(self, key, create):
+        """get(), or create() and put() on a miss.
+
+        Concurrent callers missing the same key (e.g. two decks of the same
+        model showing the same key) wait for one create() instead of each
+        rendering it.
+        """
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        with self.lock:
+            event = self.creating.get(key)
+            creator = event is None
+            if creator:
+                event = self.creating[key] = threading.Event()
+
+        if not creator:
+            event.wait()
+            data = self.get(key)
+            return data if data is not None else create()
+
+        try:
+            data = create()
+            self.put(key, data)
+            return data
+        finally:
+            with self.lock:
+                del self.creating[key]
+            event.set()
+
+    def prune_disk(self, keep=None):
+        """Drop the oldest on-disk frames beyond keep (default max_disk_entries)"""
+        keep = self.max_disk_entries if keep is None else keep
+        entries = [p for p in self.disk_dir.iterdir() if not p.name.startswith('.')]
+        self.disk_entries = len(entries)
+        if len(entries) <= keep:
+            return
+
+        def mtime(path):
+            try:
+                return path.stat().st_mtime
+            except OSError:
+                return 0
+
+        entries.sort(key=mtime)
+        for path in entries[:len(entries) - keep]:
+            try:
+                path.unlink()
+                self.disk_entries -= 1
+            except OSError:
+                pass
+
+
+class InotifyWatcher:
+    """Reports changed files in a set of directories using Linux inotify.
+
+    A reader thread collects events; get_changes() hands them out once they
+    have been quiet for `debounce` seconds, so editors that save in several
+    steps produce one change. accept(path) filters out irrelevant files.
+    """
+
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    EVENT_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, directories, accept=None, debounce=0.1, max_delay=0.5):
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.watches = {}
+        try:
+            for directory in directories:
+                self.add_directory(directory)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+        self.accept = accept or (lambda path: True)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.condition = threading.Condition()
+        self.pending = set()
+        self.overflow = False
+        self.first_event = 0
+        self.last_event = 0
+        self.woken = False
+
+        threading.Thread(target=self._read, name="inotify", daemon=True).start()
+
+    def add_directory(self, directory):
+        """Start watching another directory (watching one twice is harmless)"""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), self.EVENT_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self.watches[wd] = Path(directory)
+
+    def _read(self):
+        while True:
+            try:
+                select.select([self.fd], [], [])
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                continue
+            except (OSError, ValueError):
+                return  # closed
+
+            paths = set()
+            overflow = False
+            offset = 0
+            while offset + 16 <= len(data):
+                wd, mask, _cookie, length = struct.unpack_from('iIII', data, offset)
+                name = data[offset + 16:offset + 16 + length].rstrip(b'\0')
+                offset += 16 + length
+
+                if mask & self.IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                directory = self.watches.get(wd)
+                if directory is not None and name:
+                    path = directory / os.fsdecode(name)
+                    if self.accept(path):
+                        paths.add(path)
+
+            if paths or overflow:
+                with self.condition:
+                    now = time.monotonic()
+                    if not (self.pending or self.overflow):
+                        self.first_event = now
+                    self.pending |= paths
+                    self.overflow = self.overflow or overflow
+                    self.last_event = now
+                    self.condition.notify_all()
+
+    def get_changes(self, timeout=0):
+        """Wait up to timeout seconds for settled changes.
+
+        Returns the set of changed paths (empty if none), or None if events
+        were lost and everything should be treated as changed.
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                if self.pending or self.overflow:
+                    settle = min(self.last_event + self.debounce, self.first_event + self.max_delay) - now
+                    if settle <= 0:
+                        if self.overflow:
+                            self.pending = set()
+                            self.overflow = False
+                            return None
+                        changes = self.pending
+                        self.pending = set()
+                        return changes
+                    wait_time = min(settle, deadline - now)
+                else:
+                    wait_time = deadline - now
+
+                if wait_time <= 0 or self.woken:
+                    self.woken = False
+                    return set()
+                self.condition.wait(wait_time)
+
+    def wake(self):
+        """Make a waiting get_changes() return early (from another thread)"""
+        with self.condition:
+            self.woken = True
+            self.condition.notify_all()
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class PollingWatcher:
+    """Fallback for systems without inotify: scans each directory every interval"""
+
+    def __init__(self, directories, accept=None, interval=0.5):
+        self.directories = [Path(d) for d in directories]
+        self.accept = accept or (lambda path: True)
+        self.interval = interval
+        self.snapshot = self._scan()
+        self.next_scan = time.monotonic() + interval
+        self.wakeup = threading.Event()
+
+    def add_directory(self, directory):
+        if Path(directory) not in self.directories:
+            self.directories.append(Path(directory))
+
+    def _scan(self):
+        entries = {}
+        for directory in self.directories:
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        path = directory / entry.name
+                        if not self.accept(path):
+                            continue
+                        try:
+                            st = entry.stat()
+                            entries[path] = (st.st_mtime_ns, st.st_size)
+                        except OSError:
+                            pass
+            except OSError:
+                pass
+        return entries
+
+    def get_changes(self, timeout=0):
+        """Same contract as InotifyWatcher.get_changes()"""
+        delay = self.next_scan - time.monotonic()
+        if delay > timeout:
+            if self.wakeup.wait(max(0, timeout)):
+                self.wakeup.clear()
+            return set()
+        if delay > 0 and self.wakeup.wait(delay):
+            self.wakeup.clear()
+            return set()
+
+        self.next_scan = time.monotonic() + self.interval
+        snapshot = self._scan()
+        changes = {
+            path for path in snapshot.keys() | self.snapshot.keys()
+            if snapshot.get(path) != self.snapshot.get(path)
+        }
+        self.snapshot = snapshot
+        return changes
+
+    def wake(self):
+        self.wakeup.set()
+
+    def close(self):
+        pass
+
+
+class HotplugMonitor:
+    """Listens for kernel uevents about USB devices from one vendor.
+
+    callback(action) is called from the monitor thread with "add" or
+    "remove". Adds are reported for the hidraw node, which appears once the
+    device can be opened; removes as soon as the USB device goes away.
+    "overflow" means the kernel dropped events (ENOBUFS during a burst, e.g.
+    plugging in a dock) and the device's state has to be checked directly.
+    alive turns False if the socket fails for good; events are then missed.
+    """
+
+    NETLINK_KOBJECT_UEVENT = 15
+    KERNEL_GROUP = 1
+
+    def __init__(self, callback, vendor_id=0x0fd9):
+        self.callback = callback
+        self.product_prefix = f"{vendor_id:x}/".encode()
+        self.hid_id = f":{vendor_id:04X}:".encode()
+        self.closed = False
+        self.alive = True
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, self.NETLINK_KOBJECT_UEVENT)
+        try:
+            self.sock.bind((0, self.KERNEL_GROUP))
+        except OSError:
+            self.sock.close()
+            raise
+        threading.Thread(target=self._run, name="hotplug", daemon=True).start()
+
+    def parse(self, data):
+        """Action of a uevent for our vendor's device, or None"""
+        fields = data.split(b'\0')
+        env = dict(field.split(b'=', 1) for field in fields[1:] if b'=' in field)
+        action = env.get(b'ACTION')
+        if action not in (b'add', b'remove'):
+            return None
+
+        subsystem = env.get(b'SUBSYSTEM')
+        if subsystem == b'usb' and env.get(b'DEVTYPE') == b'usb_device' and action == b'remove':
+            if env.get(b'PRODUCT', b'').startswith(self.product_prefix):
+                return 'remove'
+        elif subsystem == b'hidraw' and self.hid_id in env.get(b'DEVPATH', b'').upper():
+            return action.decode()
+        return None
+
+    def _run(self):
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except OSError as e:
+                if self.closed:
+                    return
+                if e.errno == errno.ENOBUFS:
+                    action = 'overflow'  # the receive queue overran: events were lost
+                elif e.errno == errno.EINTR:
+                    continue
+                else:
+                    logging.error(f"Hotplug monitor failed, falling back to enumeration: {e}")
+                    self.alive = False
+                    action = 'overflow'  # wake the daemon to re-check and fall back
+            else:
+                action = self.parse(data)
+            if action:
+                try:
+                    self.callback(action)
+                except Exception as e:
+                    logging.error(f"Error handling hotplug {action}: {e}")
+            if not self.alive:
+                return
+
+    def close(self):
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class ReconnectBackoff:
+    """When to try reconnecting: right away, then at exponentially growing
+    intervals up to max_delay.
+
+    States: 'connected'; 'retrying' while attempts are scheduled. kick()
+    (the device was seen again) makes the next attempt due immediately with
+    the short delays, as after the disconnect. A connection lost within
+    max_delay of being made (a deck that opens but fails every write) keeps
+    backing off instead of starting over.
+    """
+
+    def __init__(self, initial_delay=0.1, max_delay=5.0, factor=2.0):
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.delay = initial_delay
+        self.attempts = 0
+        self.connected_at = 0.0
+        self.succeeded()
+
+    def succeeded(self, now=None):
+        self.state = 'connected'
+        self.attempts = 0
+        self.connected_at = now or time.time()
+        self.next_attempt = 0.0
+
+    def lost(self, now=None):
+        """The connection dropped: retry right away if it had been stable,
+        otherwise after the next backoff delay"""
+        now = now or time.time()
+        self.state = 'retrying'
+        if now - self.connected_at >= self.max_delay:
+            self.delay = self.initial_delay
+            self.next_attempt = 0.0
+        else:
+            self.next_attempt = now + self.delay
+            self.delay = min(self.delay * self.factor, self.max_delay)
+
+    def kick(self):
+        self.state = 'retrying'
+        self.delay = self.initial_delay
+        self.next_attempt = 0.0
+
+    def due(self, now=None):
+        """Whether an attempt should be made now"""
+        return (now or time.time()) >= self.next_attempt
+
+    def failed(self, now=None):
+        """Record a failed attempt and schedule the next one"""
+        self.state = 'retrying'
+        self.attempts += 1
+        self.next_attempt = (now or time.time()) + self.delay
+        self.delay = min(self.delay * self.factor, self.max_delay)
+
+    def wait_time(self, now=None):
+        """Seconds until the next attempt is due"""
+        return max(0.0, self.next_attempt - (now or time.time()))
+
+
+class RenderedPage(namedtuple('RenderedPage', ['frames', 'animations'])):
+    """Frames of one page of keys, ready to push: {key index: native frame} and
+    {key index: Animation} for animated keys"""
+
+    @property
+    def nbytes(self):
+        size = sum(len(frame) for frame in self.frames.values())
+        for animation in self.animations.values():
+            size += sum(len(frame) for frame in animation.frames)
+        return size
+
+
+class Animation:
+    """Pre-decoded native frames of an animated key or zone, played as a ring buffer"""
+
+    def __init__(self, frames, durations, first_image):
+        self.frames = frames          # native-format bytes per frame
+        self.durations = durations    # seconds each frame stays on screen
+        self.first_image = first_image
+        self.index = 0
+        self.next_due = 0
+
+
+class AnimationScheduler:
+    """One thread that pushes animation frames as they fall due.
+
+    push(target, frame, is_current) is called with the target an animation was
+    played on; is_current() tells whether that animation is still playing
+    there, so a frame racing with stop() can be dropped.
+    No animation advances faster than max_fps, whatever its own frame timing.
+    """
+
+    def __init__(self, push, max_fps=15):
+        self.push = push
+        self.max_fps = max_fps
+        self.animations = {}
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+
+    def frame_interval(self, animation, index):
+        return max(animation.durations[index], 1.0 / self.max_fps)
+
+    def play(self, target, animation):
+        """Start (or keep) playing animation on target"""
+        with self.condition:
+            if self.animations.get(target) is animation:
+                return
+            animation.index = 0
+            animation.next_due = time.monotonic() + self.frame_interval(animation, 0)
+            self.animations[target] = animation
+            self.condition.notify()
+
+        if self.thread is None or not self.thread.is_alive():
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name="animations", daemon=True)
+            self.thread.start()
+
+    def stop(self, target):
+        """Stop any animation on target"""
+        with self.condition:
+            self.animations.pop(target, None)
+
+    def clear(self):
+        with self.condition:
+            self.animations.clear()
+
+    def shutdown(self):
+        with self.condition:
+            self.running = False
+            self.animations.clear()
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                if not self.running:
+                    return
+                if not self.animations:
+                    self.condition.wait()
+                    continue
+
+                now = time.monotonic()
+                target, animation = min(self.animations.items(), key=lambda item: item[1].next_due)
+                delay = animation.next_due - now
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+
+                animation.index = (animation.index + 1) % len(animation.frames)
+                animation.next_due += self.frame_interval(animation, animation.index)
+                if animation.next_due < now:
+                    # Fell behind (slow USB); skip ahead instead of bursting
+                    animation.next_due = now + self.frame_interval(animation, animation.index)
+                frame = animation.frames[animation.index]
+
+            try:
+                self.push(target, frame, lambda t=target, a=animation: self.animations.get(t) is a)
+            except Exception as e:
+                logging.debug(f"Error pushing animation frame to {target}: {e}")
+
+
+class ScheduledCall:
+    """Handle of a TimerScheduler call; cancel() it like a threading.Timer"""
+
+    __slots__ = ('due', 'function', 'args', 'cancelled')
+
+    def __init__(self, due, function, args):
+        self.due = due
+        self.function = function
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerScheduler:
+    """One thread running delayed calls from a heap, instead of a
+    threading.Timer (and an OS thread) per timeout.
+
+    schedule(delay, function, *args) returns a ScheduledCall whose cancel()
+    works like Timer.cancel(). Cancelled calls stay in the heap until they
+    come due and are skipped. Calls run on the scheduler thread, so they must
+    be short.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.sequence = itertools.count()  # breaks ties between calls due at the same time
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+
+    def schedule(self, delay, function, *args):
+        call = ScheduledCall(time.monotonic() + delay, function, args)
+        with self.condition:
+            heapq.heappush(self.heap, (call.due, next(self.sequence), call))
+            if self.heap[0][2] is call:
+                self.condition.notify()
+
+            if self.thread is None or not self.thread.is_alive():
+                self.running = True
+                self.thread = threading.Thread(target=self._run, name="timers", daemon=True)
+                self.thread.start()
+        return call
+
+    def shutdown(self):
+        with self.condition:
+            self.running = False
+            self.heap.clear()
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                if not self.running:
+                    return
+                if not self.heap:
+                    self.condition.wait()
+                    continue
+
+                delay = self.heap[0][0] - time.monotonic()
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+                call = heapq.heappop(self.heap)[2]
+
+            if call.cancelled:
+                continue
+            try:
+                call.function(*call.args)
+            except Exception as e:
+                logging.error(f"Error in timer {getattr(call.function, '__name__', call.function)}: {e}")
+
+
+class InputDispatcher:
+    """Thread that handles input events away from the HID reader thread.
+
+    submit(handler, *args) timestamps the event and queues it; it never
+    blocks on the filesystem or a fork, so the device's reader thread goes
+    straight back to reading reports. Handlers run one at a time in arrival
+    order. stats() reports how long events waited to be dispatched.
+    """
+
+    def __init__(self):
+        self.events = deque()
+        self.condition = threading.Condition()
+        self.running = True
+        self.dispatched = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.handle_time = 0.0
+        self.max_handle_time = 0.0
+        self.thread = threading.Thread(target=self._run, name="input", daemon=True)
+        self.thread.start()
+
+    def submit(self, handler, *args):
+        with self.condition:
+            self.events.append((time.perf_counter(), handler, args))
+            self.max_depth = max(self.max_depth, len(self.events))
+            self.condition.notify()
+
+    def stats(self):
+        """Queue depth, input-to-dispatch latency and handler time (milliseconds) so far"""
+        with self.condition:
+            dispatched = max(self.dispatched, 1)
+            return {
+                "depth": len(self.events),
+                "max_depth": self.max_depth,
+                "dispatched": self.dispatched,
+                "errors": self.errors,
+                "avg_dispatch_ms": round(self.wait_time / dispatched * 1000, 3),
+                "max_dispatch_ms": round(self.max_wait_time * 1000, 3),
+                "avg_handle_ms": round(self.handle_time / dispatched * 1000, 3),
+                "max_handle_ms": round(self.max_handle_time * 1000, 3),
+            }
+
+    def close(self):
+        with self.condition:
+            self.running = False
+            self.events.clear()
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.events:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                received_at, handler, args = self.events.popleft()
+
+            start = time.perf_counter()
+            error = False
+            try:
+                handler(*args)
+            except Exception as e:
+                error = True
+                logging.error(f"Error handling input in {handler.__name__}: {e}")
+            end = time.perf_counter()
+
+            with self.condition:
+                self.dispatched += 1
+                self.errors += error
+                self.wait_time += start - received_at
+                self.max_wait_time = max(self.max_wait_time, start - received_at)
+                self.handle_time += end - start
+                self.max_handle_time = max(self.max_handle_time, end - start)
+
+
+class DeviceWriter:
+    """Thread that owns all image output to one deck.
+
+    submit() queues a frame for ('key', index) or ('rect', (x, y, width, height)),
+    or a percentage for ('brightness', None), and returns immediately. A newer frame for a target that is still queued
+    replaces the older one, so a producer faster than USB never builds a
+    backlog. A replaced frame is kept behind a conditional one (with
+    is_current) and written instead if that turns out stale. on_error(exception)
+    is called from the writer thread when a write fails.
+    """
+
+    def __init__(self, deck, on_error=None):
+        self.deck = deck
+        self.on_error = on_error
+        self.pending = OrderedDict()  # target -> (candidates, queued_at), oldest first
+        self.condition = threading.Condition()
+        self.writing = False
+        self.running = True
+
+        self.writes = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.write_time = 0.0
+        self.max_write_time = 0.0
+        self.queue_time = 0.0
+        self.max_queue_time = 0.0
+
+        self.thread = threading.Thread(target=self._run, name="device-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, target, frame, is_current=None):
+        """Queue a frame; is_current() is checked just before writing and a False
+        drops it, writing the still-current frame it replaced instead if any"""
+        with self.condition:
+            old = self.pending.pop(target, None)
+            candidates = [(frame, is_current)]
+            if old:
+                self.coalesced += 1
+                # (frame, is_current) newest first: a couple of the replaced
+                # frames and the newest unconditional one, if any
+                if is_current:
+                    replaced = old[0]
+                    candidates += replaced[:2]
+                    if len(replaced) > 2 and replaced[-1][1] is None:
+                        candidates.append(replaced[-1])
+            # Re-queued at the back so overlapping touchscreen rectangles keep their order
+            self.pending[target] = (candidates, old[1] if old else time.perf_counter())
+            self.max_depth = max(self.max_depth, len(self.pending))
+            self.condition.notify()
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far has been written. Returns False on timeout."""
+        with self.condition:
+            return self.condition.wait_for(lambda: not (self.pending or self.writing), timeout)
+
+    def stats(self):
+        """Queue depth and write latency (milliseconds) so far"""
+        with self.condition:
+            writes = max(self.writes, 1)
+            return {
+                "depth": len(self.pending),
+                "max_depth": self.max_depth,
+                "writes": self.writes,
+                "coalesced": self.coalesced,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "avg_write_ms": round(self.write_time / writes * 1000, 2),
+                "max_write_ms": round(self.max_write_time * 1000, 2),
+                "avg_queue_ms": round(self.queue_time / writes * 1000, 2),
+                "max_queue_ms": round(self.max_queue_time * 1000, 2),
+            }
+
+    def close(self, timeout=1.0):
+        """Write what is queued (up to timeout) and stop the thread"""
+        self.flush(timeout)
+        with self.condition:
+            self.running = False
+            self.pending.clear()
+            self.condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                target, (candidates, queued_at) = self.pending.popitem(last=False)
+                self.writing = True
+
+            kind, name = target
+            start = time.perf_counter()
+            error = None
+            try:
+                with self.deck:
+                    frame = next((frame for frame, is_current in candidates
+                                  if not is_current or is_current()), None)
+                    if frame is None:
+                        start = None
+                    elif kind == 'key':
+                        self.deck.set_key_image(name, frame)
+                    elif kind == 'brightness':
+                        self.deck.set_brightness(frame)
+                    else:
+                        self.deck.set_touchscreen_image(frame, *name)
+            except Exception as e:
+                error = e
+            end = time.perf_counter()
+
+            with self.condition:
+                self.writing = False
+                if error:
+                    self.errors += 1
+                elif start is None:
+                    self.dropped += 1
+                else:
+                    self.writes += 1
+                    self.write_time += end - start
+                    self.max_write_time = max(self.max_write_time, end - start)
+                    self.queue_time += start - queued_at
+                    self.max_queue_time = max(self.max_queue_time, start - queued_at)
+                self.condition.notify_all()
+
+            if error and self.on_error:
+                self.on_error(error)
+
+
+# Native key formats of the real devices, for virtual decks: (format, flip, rotation)
+VIRTUAL_KEY_FORMATS = {
+    "Stream Deck Mini": ("BMP", (False, True), 90),
+    "Stream Deck": ("BMP", (True, True), 0),
+    "Stream Deck MK.2": ("JPEG", (True, True), 0),
+    "Stream Deck XL": ("JPEG", (True, True), 0),
+    "Stream Deck Neo": ("JPEG", (True, True), 0),
+}
+
+
+class VirtualDeck:
+    """A Stream Deck in software, for benchmarks and testing without hardware.
+
+    Implements the parts of the StreamDeck device API the daemon uses for
+    any model in DEVICE_PROFILES. Frames written to it are kept in
+    key_images and touchscreen_images and counted in writes; press_key(),
+    turn_dial(), push_dial() and touch() call the registered callbacks like
+    the device's reader thread would, but from the calling thread.
+    write_delay simulates the time a USB write takes.
+    """
+
+    def __init__(self, model="Stream Deck +", serial="VIRTUAL0", write_delay=0.0):
+        self.model = model
+        self.profile = DEVICE_PROFILES[model]
+        self.serial = serial
+        self.write_delay = write_delay
+        self.lock = threading.RLock()
+        self.attached = True
+        self.opened = False
+        self.brightness = None
+        self.key_images = {}
+        self.touchscreen_images = {}  # (x, y, width, height) -> frame
+        self.writes = 0
+        self.key_callback = None
+        self.dial_callback = None
+        self.touchscreen_callback = None
+
+    def __enter__(self):
+        self.lock.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.lock.release()
+
+    def id(self):
+        return f"virtual:{self.serial}"
+
+    def deck_type(self):
+        return self.model
+
+    def get_serial_number(self):
+        return self.serial
+
+    def get_firmware_version(self):
+        return "virtual"
+
+    def connected(self):
+        return self.attached
+
+    def open(self):
+        if not self.attached:
+            raise TransportError(f"{self.id()} is unplugged")
+        self.opened = True
+
+    def close(self):
+        self.opened = False
+
+    def is_open(self):
+        return self.opened
+
+    def is_visual(self):
+        return self.profile['buttons'] > 0
+
+    def is_touch(self):
+        return bool(self.profile['touchscreen'])
+
+    def key_count(self):
+        return self.profile['buttons'] or self.profile['pedals']
+
+    def dial_count(self):
+        return self.profile['dials']
+
+    def key_layout(self):
+        cols, rows = self.profile['button_layout']
+        return rows, cols
+
+    def key_image_format(self):
+        image_format, flip, rotation = VIRTUAL_KEY_FORMATS.get(self.model, ("JPEG", (False, False), 0))
+        return {"size": self.profile['button_size'], "format": image_format, "flip": flip, "rotation": rotation}
+
+    def touchscreen_image_format(self):
+        ts = self.profile['touchscreen']
+        if not ts or ts.get('type') == 'info_strip':
+            # As the library reports it: the Neo's info strip takes no touchscreen images
+            return {"size": (0, 0), "format": "", "flip": (False, False), "rotation": 0}
+        return {"size": (ts['width'], ts['height']), "format": "JPEG", "flip": (False, False), "rotation": 0}
+
+    def _write(self):
+        if not (self.attached and self.opened):
+            raise TransportError(f"{self.id()} is not open")
+        if self.write_delay:
+            time.sleep(self.write_delay)
+        self.writes += 1
+
+    def reset(self):
+        self._write()
+        self.key_images.clear()
+        self.touchscreen_images.clear()
+
+    def set_brightness(self, percent):
+        self._write()
+        self.brightness = percent
+
+    def set_key_image(self, key, image):
+        if not 0 <= key < self.profile['buttons']:
+            raise IndexError(f"Invalid key index {key}.")
+        self._write()
+        self.key_images[key] = image
+
+    def set_touchscreen_image(self, image, x_pos=0, y_pos=0, width=0, height=0):
+        if not self.profile['touchscreen']:
+            raise TypeError("Touchscreen not supported.")
+        if self.profile['touchscreen'].get('type') == 'info_strip':
+            return  # a no-op in the library's Neo class
+        self._write()
+        self.touchscreen_images[(x_pos, y_pos, width, height)] = image
+
+    def set_key_callback(self, callback):
+        self.key_callback = callback
+
+    def set_dial_callback(self, callback):
+        self.dial_callback = callback
+
+    def set_touchscreen_callback(self, callback):
+        self.touchscreen_callback = callback
+
+    def unplug(self):
+        """Disconnect, as when the cable is pulled"""
+        self.attached = False
+        self.opened = False
+
+    def plug(self):
+        self.attached = True
+
+    def press_key(self, key, state=True):
+        if self.key_callback:
+            self.key_callback(self, key, state)
+
+    def tap_key(self, key):
+        self.press_key(key, True)
+        self.press_key(key, False)
+
+    def turn_dial(self, dial, steps):
+        """Rotate a dial: positive steps clockwise"""
+        if self.dial_callback:
+            self.dial_callback(self, dial, DialEventType.TURN, steps)
+
+    def push_dial(self, dial, state=True):
+        if self.dial_callback:
+            self.dial_callback(self, dial, DialEventType.PUSH, state)
+
+    def touch(self, x, y=50, x_out=None, y_out=None, long=False):
+        """Tap (or long press) at x, y, or drag from there to x_out, y_out"""
+        if not self.touchscreen_callback:
+            return
+        if x_out is not None:
+            value = {'x': x, 'y': y, 'x_out': x_out, 'y_out': y if y_out is None else y_out}
+            self.touchscreen_callback(self, TouchscreenEventType.DRAG, value)
+        else:
+            event_type = TouchscreenEventType.LONG if long else TouchscreenEventType.SHORT
+            self.touchscreen_callback(self, event_type, {'x': x, 'y': y})
+
+
+class VirtualDeviceManager:
+    """Stands in for DeviceManager, enumerating the same virtual decks every time"""
+
+    def __init__(self, models, write_delay=0.0):
+        self.decks = [VirtualDeck(model, f"VIRTUAL{i}", write_delay) for i, model in enumerate(models)]
+
+    def enumerate(self):
+        return [deck for deck in self.decks if deck.attached]
+
+
+class Widget:
+    """A live key or touch zone drawn in-process by a render function.
+
+    target is "button-N" or "touch-N". render(widget) returns a PIL image and
+    is called every interval seconds; the daemon fits the image to the key or
+    zone and pushes it directly. widget.state is free for the render function
+    to keep history between updates.
+    """
+
+    def __init__(self, target, interval, render, options=None):
+        self.target = target
+        self.interval = interval
+        self.render = render
+        self.options = options or {}
+        self.state = {}
+        self.image = None
+        self.frame = None
+        self.next_due = 0
+        self.busy = False
+
+
+def level_color(percent, low=50, high=80, colors=('#4CAF50', '#FFC107', '#f44336')):
+    """Green/amber/red for a percentage"""
+    if percent < low:
+        return colors[0]
+    elif percent < high:
+        return colors[1]
+    return colors[2]
+
+
+def read_cpu_percent(state):
+    """CPU usage since the previous call, from /proc/stat (state keeps the last sample)"""
+    try:
+        with open('/proc/stat') as f:
+            fields = [int(v) for v in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return 0
+
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+    total = sum(fields)
+    last_idle, last_total = state.get('cpu_sample', (idle, total))
+    state['cpu_sample'] = (idle, total)
+
+    if total == last_total:
+        return state.get('cpu_percent', 0)
+    state['cpu_percent'] = round(100 * (1 - (idle - last_idle) / (total - last_total)))
+    return max(0, min(100, state['cpu_percent']))
+
+
+def read_memory_percent():
+    """Used memory percentage from /proc/meminfo"""
+    try:
+        info = {}
+        with open('/proc/meminfo') as f:
+            for line in f:
+                name, value = line.split(':', 1)
+                info[name] = int(value.split()[0])
+        return round(100 * (info['MemTotal'] - info['MemAvailable']) / info['MemTotal'])
+    except (OSError, KeyError, ValueError):
+        return 0
+
+
+def draw_rounded_bar(draw, width, height, percent, color):
+    """Horizontal bar used by the CPU and volume widgets (200x100 layout)"""
+    bar_margin = 15
+    bar_height = 20
+    bar_y = (height - bar_height) // 2 + 15
+    bar_width = width - (bar_margin * 2)
+
+    draw.rounded_rectangle(
+        [(bar_margin, bar_y), (bar_margin + bar_width, bar_y + bar_height)],
+        radius=10,
+        fill='#333333'
+    )
+
+    fill_width = int((bar_width * percent) / 100)
+    if fill_width > 0:
+        draw.rounded_rectangle(
+            [(bar_margin, bar_y), (bar_margin + fill_width, bar_y + bar_height)],
+            radius=10,
+            fill=color
+        )
+
+
+def render_cpu_chart_widget(widget):
+    """CPU history sparkline (in-process version of generate-cpu-chart.py)"""
+    max_points = widget.options.get('points', 30)
+    cpu = read_cpu_percent(widget.state)
+    history = widget.state.setdefault('history', [])
+    history.append(cpu)
+    del history[:-max_points]
+
+    width, height = 200, 100
+    img = Image.new('RGB', (width, height), color='#0a0a0a')
+    draw = ImageDraw.Draw(img)
+
+    margin_left, margin_right, margin_top, margin_bottom = 10, 10, 25, 10
+    chart_width = width - margin_left - margin_right
+    chart_height = height - margin_top - margin_bottom
+
+    draw.rectangle(
+        [(margin_left, margin_top), (width - margin_right, height - margin_bottom)],
+        fill='#1a1a1a',
+        outline='#333333'
+    )
+    for i in range(1, 4):
+        y = margin_top + (chart_height * i // 4)
+        draw.line([(margin_left, y), (width - margin_right, y)], fill='#2a2a2a', width=1)
+
+    if len(history) >= 2:
+        points = [
+            (margin_left + (i * chart_width // (max_points - 1)),
+             margin_top + chart_height - (val * chart_height // 100))
+            for i, val in enumerate(history)
+        ]
+        draw.line(points, fill=level_color(cpu), width=2)
+
+    draw.text((margin_left + 5, 5), f"CPU {cpu}%", fill=level_color(cpu), font=get_font(FONT_BOLD, 16))
+    return img
+
+
+def render_cpu_bar_widget(widget):
+    """CPU usage bar (in-process version of generate-cpu-image.py)"""
+    cpu = read_cpu_percent(widget.state)
+    img = Image.new('RGB', (200, 100), color='#0a0a0a')
+    draw = ImageDraw.Draw(img)
+
+    draw_rounded_bar(draw, 200, 100, cpu, level_color(cpu))
+    text_color = '#ffffff' if cpu < 50 else level_color(cpu)
+    draw.text((90, 18), f"{cpu}%", fill=text_color, font=get_font(FONT_BOLD, 20), anchor="mm")
+    draw.text((130, 18), "CPU", fill='#666666', font=get_font(FONT_REGULAR, 14), anchor="mm")
+    return img
+
+
+def render_volume_widget(widget):
+    """Default sink volume bar (in-process version of generate-volume-image.py)"""
+    volume = 0
+    muted = False
+    try:
+        output = subprocess.run(
+            ['wpctl', 'get-volume', '@DEFAULT_AUDIO_SINK@'],
+            capture_output=True, text=True, timeout=1
+        ).stdout
+        volume = round(float(output.split()[1]) * 100)
+        muted = 'muted' in output.lower()
+    except Exception as e:
+        logging.debug(f"Could not read volume: {e}")
+
+    volume = max(0, min(100, volume))
+    img = Image.new('RGB', (200, 100), color='#0a0a0a')
+    draw = ImageDraw.Draw(img)
+
+    draw_rounded_bar(draw, 200, 100, 0 if muted else volume, level_color(volume, 30, 70))
+    text, text_color = ("MUTED", '#f44336') if muted else (f"{volume}%", '#ffffff')
+    draw.text((100, 20), text, fill=text_color, font=get_font(FONT_BOLD, 24), anchor="mm")
+    return img
+
+
+def render_sysinfo_widget(widget):
+    """CPU/RAM/disk bars (in-process version of buttons/generate-sysinfo-image.py)"""
+    img = Image.new('RGB', (120, 120), color='#1a1a2e')
+    draw = ImageDraw.Draw(img)
+    draw.text((60, 4), "SYSTEM", fill='#888888', font=get_font(FONT_BOLD, 10), anchor="mt")
+
+    disk = shutil.disk_usage(widget.options.get('path', '/'))
+    rows = [
+        ("CPU", read_cpu_percent(widget.state)),
+        ("RAM", read_memory_percent()),
+        ("DISK", round(100 * disk.used / disk.total)),
+    ]
+    colors = ('#00ff88', '#ffaa00', '#ff4444')
+
+    y, row_h, bar_w, bar_h = 20, 32, 80, 8
+    for label, pct in rows:
+        color = level_color(pct, colors=colors)
+        draw.text((8, y), label, fill='#aaaaaa', font=get_font(FONT_BOLD, 9))
+        draw.text((112, y), f"{pct}%", fill=color, font=get_font(FONT_BOLD, 8), anchor="rt")
+        draw.rectangle([(8, y + 12), (8 + bar_w, y + 12 + bar_h)], outline='#444444', width=1)
+        fill_width = int((bar_w - 2) * (pct / 100))
+        if fill_width > 0:
+            draw.rectangle([(9, y + 13), (9 + fill_width, y + 11 + bar_h)], fill=color)
+        y += row_h
+    return img
+
+
+def render_uptime_widget(widget):
+    """Site status list (in-process version of buttons/generate-uptime-image.py)"""
+    sites = widget.options.get('sites', [["GitHub", "github.com"], ["Google", "google.com"]])
+    img = Image.new('RGB', (120, 120), color='#1a1a2e')
+    draw = ImageDraw.Draw(img)
+    draw.text((60, 4), "UPTIME", fill='#888888', font=get_font(FONT_BOLD, 11), anchor="mt")
+
+    site_font = get_font(FONT_BOLD, 9)
+    for i, (name, domain) in enumerate(sites[:6]):
+        try:
+            request = urllib.request.Request(f"https://{domain}", method='HEAD')
+            with urllib.request.urlopen(request, timeout=2) as response:
+                is_up = response.status < 400
+        except Exception:
+            is_up = False
+
+        y = 18 + i * 17
+        draw.text((8, y), "●" if is_up else "○", fill='#00ff88' if is_up else '#ff4444', font=site_font)
+        draw.text((20, y), name[:8], fill='#ffffff' if is_up else '#888888', font=site_font)
+    return img
+
+
+# Built-in widget types for widgets.json
+WIDGET_TYPES = {
+    "cpu-chart": render_cpu_chart_widget,
+    "cpu-bar": render_cpu_bar_widget,
+    "volume": render_volume_widget,
+    "sysinfo": render_sysinfo_widget,
+    "uptime": render_uptime_widget,
+}
+
+
+class FramePushHandler(socketserver.StreamRequestHandler):
+    """One frame push connection.
+
+    Each request is a JSON header line followed by header["length"] payload
+    bytes; each is answered with a JSON line {"ok": true} or
+    {"ok": false, "error": "..."}. Clients may keep the connection open.
+    {"target": "stats"} answers with the device writer's queue and latency
+    stats, and the input dispatcher's under "input", instead of sending
+    anything.
+    """
+
+    def handle(self):
+        daemon = self.server.deck_daemon
+        while True:
+            line = self.rfile.readline(65536)
+            if not line:
+                return
+            try:
+                header = json.loads(line)
+                length = int(header.get('length', 0))
+                payload = self.rfile.read(length)
+                if len(payload) != length:
+                    return
+                if header.get('target') == 'stats':
+                    reply = {"ok": True, "stats": daemon.writer.stats() if daemon.writer else None,
+                             "input": daemon.dispatcher.stats()}
+                else:
+                    daemon.handle_frame_push(header, payload)
+                    reply = {"ok": True}
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(reply) + "\n").encode('utf-8'))
+
+
+class X11WindowSource:
+    """Reports the focused application by watching _NET_ACTIVE_WINDOW on the X11 root window.
+
+    Event-driven: the thread sleeps in the X event queue until the window
+    manager changes the property. callback(names) receives the WM_CLASS
+    (instance, class) of the newly focused window, lowercased.
+    Needs python-xlib and a DISPLAY.
+    """
+
+    def __init__(self):
+        if Xlib is None:
+            raise RuntimeError("python-xlib is not installed")
+        self.display = Xlib.display.Display()
+        self.root = self.display.screen().root
+        self.active_window_atom = self.display.intern_atom('_NET_ACTIVE_WINDOW')
+        self.running = False
+
+    def active_app(self):
+        prop = self.root.get_full_property(self.active_window_atom, X.AnyPropertyType)
+        if not prop or not prop.value or not prop.value[0]:
+            return None
+        window = self.display.create_resource_object('window', prop.value[0])
+        try:
+            wm_class = window.get_wm_class()
+        except Xlib.error.XError:
+            return None  # closed before we asked
+        return tuple(name.lower() for name in wm_class) if wm_class else None
+
+    def start(self, callback):
+        self.root.change_attributes(event_mask=X.PropertyChangeMask)
+        self.display.flush()
+        self.running = True
+        threading.Thread(target=self._run, args=(callback,), name="x11-window", daemon=True).start()
+
+    def _run(self, callback):
+        last = None
+        while self.running:
+            app = self.active_app()
+            if app and app != last:
+                last = app
+                try:
+                    callback(app)
+                except Exception as e:
+                    logging.error(f"Error handling focus change to {app}: {e}")
+
+            # Block until the active window changes
+            while self.running:
+                event = self.display.next_event()
+                if event.type == X.PropertyNotify and event.atom == self.active_window_atom:
+                    break
+
+    def stop(self):
+        self.running = False
+
+
+# Focused-window sources, tried in order when none is given to start_window_source()
+WINDOW_SOURCES = [X11WindowSource]
+
+
 # Paths
 ACTIONS_DIR = Path(__file__).parent.resolve()
 BUTTONS_DIR = ACTIONS_DIR / "buttons"
+PAGES_DIR = ACTIONS_DIR / "pages"
 DIALS_DIR = ACTIONS_DIR / "dials"
 TOUCH_DIR = ACTIONS_DIR / "touchscreen"
 LOG_FILE = ACTIONS_DIR / "daemon.log"
+WIDGETS_FILE = ACTIONS_DIR / "widgets.json"
+BRIGHTNESS_FILE = ACTIONS_DIR / ".brightness"
+ENCODER_PROFILES_FILE = ACTIONS_DIR / "encoder-profiles.json"  # written by --calibrate-encoder
+DECKS_DIR = ACTIONS_DIR / "decks"  # decks/<serial>/ holds the actions of additional decks
+PAGE_FILE = ACTIONS_DIR / ".page"
+APP_PAGES_FILE = ACTIONS_DIR / "app-pages.json"
+PROFILE_FILES = (ACTIONS_DIR / "profile.json", ACTIONS_DIR / "profile.toml")
+FRAME_SOCKET = Path(os.environ.get("XDG_RUNTIME_DIR", "/tmp")) / f"streamdeck-daemon-{os.getuid()}.sock"
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "streamdeck-daemon"
+
+# Files the watcher reports: display files in the action directories, plus
+# a few control files in ACTIONS_DIR itself
+WATCHED_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.svg', '.txt', '.sh'}
+
+# Display files belong to the button or zone named by their prefix
+BUTTON_FILE_RE = re.compile(r"^button-(\d+)(?:-position|-fontsize)?\.")
+TOUCH_FILE_RE = re.compile(r"^(touch-\d+)(?:-position|-fontsize)?\.")
+
+# Bump when rendering output changes so stale on-disk frames are not reused
+FRAME_CACHE_VERSION = 3
+
+
+def setup_logging():
+    """Log to daemon.log and the console (called by main(), so importing the
+    daemon, e.g. from utils/virtual-deck-smoke.py, leaves logging alone)"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] %(message)s',
+        handlers=[
+            logging.FileHandler(LOG_FILE),
+            logging.StreamHandler()
+        ]
+    )
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
-
-# Set console handler to INFO level (less verbose)
-for handler in logging.getLogger().handlers:
-    if isinstance(handler, logging.StreamHandler):
-        handler.setLevel(logging.INFO)
+    # Set console handler to INFO level (less verbose)
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setLevel(logging.INFO)
 
 
 class StreamDeckDaemon:
-    """Universal daemon supporting all Stream Deck models"""
+    """Universal daemon supporting all Stream Deck models.
 
-    def __init__(self):
+    Each instance drives one deck. With several decks attached, main() runs
+    one instance per serial number, each with its own action directories,
+    sharing the frame and SVG caches.
+    """
+
+    instances = weakref.WeakSet()
+    claim_lock = threading.Lock()
+
+    def __init__(self, serial=None, config_dir=ACTIONS_DIR, frame_cache=None, svg_cache=None,
+                 device_manager=None, use_disk_cache=True):
+        StreamDeckDaemon.instances.add(self)
         self.deck = None
+        self.deck_id = None
+        self.device_manager = device_manager  # None: the USB devices
+
+        # The deck this instance drives (None: the first one not driven by
+        # another instance) and where its actions and settings live
+        self.serial = serial
+        self.config_dir = Path(config_dir)
+        self.buttons_dir = self.config_dir / BUTTONS_DIR.name
+        self.dials_dir = self.config_dir / DIALS_DIR.name
+        self.touch_dir = self.config_dir / TOUCH_DIR.name
+        self.pages_dir = self.config_dir / PAGES_DIR.name
+        self.brightness_file = self.config_dir / BRIGHTNESS_FILE.name
+        self.widgets_file = self.config_dir / WIDGETS_FILE.name
+        self.page_file = self.config_dir / PAGE_FILE.name
+        self.app_pages_file = self.config_dir / APP_PAGES_FILE.name
+        self.profile_files = tuple(self.config_dir / path.name for path in PROFILE_FILES)
+        if self.config_dir == ACTIONS_DIR:
+            self.frame_socket = FRAME_SOCKET
+        else:
+            self.frame_socket = FRAME_SOCKET.with_name(f"{FRAME_SOCKET.stem}-{serial}{FRAME_SOCKET.suffix}")
         self.running = False
         self.device_profile = None
         self.device_type = None
         self.device_connected = False
-        self.reconnect_interval = 2.0
-        self.last_reconnect_attempt = 0
+        self.reconnect = ReconnectBackoff()
+        self.deck_serial = None  # serial of the last connected deck, for warm reconnects
         self.last_device_check = 0
-        self.device_check_interval = 2.0  # Check for device presence every 2 seconds
+        self.device_present = True
+        self.device_check_interval = 2.0  # Check for device presence every 2 seconds (without hotplug events)
+
+        # Kernel hotplug events replace the periodic enumeration when available
+        self.hotplug = None
+        self.hotplug_action = None
+        self.device_removed = False  # unplugged according to hotplug events: wait for the next add
+        self.hotplug_wakeup = threading.Event()
 
         self.touch_zones = []
+        self.touch_zone_images = {}
 
         self.dial_press_times = {}
         self.dial_longpress_timers = {}
+        self.dial_turns = {}  # dial index -> ticks merged in the open coalescing window
         self.dial_longpress_triggered = {}
 
-        self.touch_press_times = {}
-        self.touch_longpress_timers = {}
-        self.touch_longpress_triggered = {}
-
-        self.last_swipe_time = 0
-        self.swipe_debounce_delay = 0.3
-        self.swipe_in_progress = False
-        self.swipe_start_x = 0
-        self.swipe_start_y = 0
-        self.swipe_end_x = 0
-        self.swipe_end_y = 0
-        self.swipe_min_x = 0
-        self.swipe_max_x = 0
-        self.swipe_last_event_time = 0
-        self.swipe_reset_timeout = 1.0
-        self.swipe_min_distance = 30
-        self.swipe_completion_timer = None
-
-        self.file_mtimes = {}
-        self.last_reload_check = 0
-        self.reload_check_interval = 0.5
+        self.gestures = None  # GestureRecognizer for the touchscreen
+
+        self.watcher = None
+        self.reload_check_interval = 0.5  # polling fallback only
 
         # Brightness monitoring
         self.last_brightness_mtime = 0
         self.current_brightness = 100
+
+        # Rendered frame and SVG raster caches (use_disk_cache=False keeps them in memory only)
+        self.encoder_settings = dict(DEFAULT_ENCODER_SETTINGS)
+        self.use_disk_cache = use_disk_cache
+        self.frame_cache = frame_cache or FrameCache(
+            disk_dir=CACHE_DIR / "frames" if self.use_disk_cache else None)
+        self.svg_cache = svg_cache or FrameCache(
+            max_entries=512, disk_dir=CACHE_DIR / "svg" if self.use_disk_cache else None)
+
+        # Writer thread owning all image output to the connected deck
+        self.writer = None
+
+        # Last native frames sent to the device, reused to repaint without image work
+        self.key_frames = {}
+        self.touchscreen_frames = {}  # (x, y, width, height) -> native bytes, in send order
+
+        # Animated keys and zones (button-N.gif, touch-N.gif, animated PNG)
+        self.animation_max_fps = 15
+        self.max_animation_frames = 240
+        self.animation_cache = {}
+        self.animator = AnimationScheduler(self.push_frame, max_fps=self.animation_max_fps)
+        self.timers = TimerScheduler()  # long presses, gesture and dial coalescing timeouts
+        self.dispatcher = InputDispatcher()  # runs key, dial and touch handlers off the HID reader thread
+
+        # Pages of keys: "main" is buttons/, every pages/<name>/ is another page.
+        # Rendered pages are kept (LRU, bounded by frame bytes) so a switch only
+        # pushes frames; the pages next to the current one and the per-app
+        # pages are rendered ahead in the background.
+        self.pages = ['main']
+        self.current_page = 'main'
+        self.page_frames = OrderedDict()  # page -> RenderedPage, most recently used last
+        self.max_page_cache_bytes = 16 * 1024 * 1024
+        self.page_lock = threading.Lock()
+        # Held while deciding and pushing what the keys show (page switches,
+        # key updates), so a key update racing a switch cannot paint the old
+        # page over the new one
+        self.page_switch_lock = threading.RLock()
+        self.page_epoch = 0  # bumped when cached pages go stale, so in-flight prefetches are dropped
+        self.prefetching = set()
+
+        # Per-application pages, switched to when the focused window changes
+        self.app_pages = {}  # lowercased WM_CLASS instance or class -> page
+        self.app_pages_mtime = None
+        self.window_source = None
+        self.active_app = None
+
+        # Single-file profile manifest (profile.json / profile.toml); keys and
+        # zones without an entry keep using their sidecar files
+        self.profile = {'buttons': {}, 'touch': {}, 'dials': {}}
+        self.profile_identity = None
+        self.profile_icons = {}  # resolved icon path -> targets ("button-N" / "touch-N") using it
+
+        # Render inputs of all keys and zones, rebuilt only for targets whose files change
+        self.render_config = RenderConfig()
+
+        # In-process live widgets, keyed by target ("button-N" / "touch-N")
+        self.widgets = {}
+        self.widgets_mtime = None
+        self.widget_thread = None
+        self.widget_wakeup = threading.Event()
+
+        # Unix socket for frames pushed by external producers
+        self.frame_server = None
+
+        # Render pool used to fan key and touch zone rendering out across threads
+        self.render_workers = min(8, os.cpu_count() or 1)
+        self.render_pool = None
+
+        # Widget updates get their own threads: a widget waiting on the network
+        # (uptime checks) must not hold up key rendering and page switches
+        self.widget_workers = 4
+        self.widget_pool = None
     
     def get_device_profile(self, deck_type):
         """Get configuration profile for the detected device"""
@@ -256,27 +2048,47 @@ class StreamDeckDaemon:
         logging.warning(f"Unknown device '{deck_type}', using default profile")
         return deck_type, DEFAULT_PROFILE
     
+    def load_encoder_settings(self):
+        """JPEG settings for this model from encoder-profiles.json, falling back to the defaults"""
+        settings = {target: dict(defaults) for target, defaults in DEFAULT_ENCODER_SETTINGS.items()}
+        try:
+            profiles = json.loads(ENCODER_PROFILES_FILE.read_text())
+        except FileNotFoundError:
+            return settings
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read {ENCODER_PROFILES_FILE.name}: {e}")
+            return settings
+
+        for target, measured in (profiles.get(self.device_type) or {}).items():
+            if target in settings and measured.get('format') == 'JPEG':
+                settings[target] = {"quality": measured['quality'], "subsampling": measured['subsampling']}
+                logging.info(f"Encoder ({target}): quality {measured['quality']}, subsampling {measured['subsampling']}")
+        return settings
+
     def setup_touch_zones(self):
         """Configure touchscreen zones based on device profile"""
         if not self.device_profile or not self.device_profile.get("touchscreen"):
             self.touch_zones = []
+            self.gestures = None
             return
         
         ts = self.device_profile["touchscreen"]
         zone_count = ts.get("zones", 4)
         zone_width = ts["width"] // zone_count
         
+        self.touch_zone_images = {}
         self.touch_zones = [
             {"x": i * zone_width, "width": zone_width, "name": f"touch-{i+1}"}
             for i in range(zone_count)
         ]
+        self.gestures = GestureRecognizer(
+            self.touch_zones, ts["width"], ts["height"], self.schedule_input, self.run_gesture)
         logging.info(f"Configured {zone_count} touchscreen zones ({zone_width}px each)")
 
     def connect_device(self):
         """Connect to Stream Deck and configure based on device type"""
         logging.info("Searching for Stream Deck devices...")
-        dm = DeviceManager()
-        decks = dm.enumerate()
+        decks = self.enumerate_decks()
 
         if len(decks) == 0:
             logging.error("No Stream Deck found!")
@@ -284,23 +2096,17 @@ class StreamDeckDaemon:
             logging.error("Try: sudo chmod 666 /dev/hidraw*")
             return False
         
-        if len(decks) > 1:
-            logging.info(f"Found {len(decks)} Stream Deck devices:")
-            for i, d in enumerate(decks):
-                d.open()
-                logging.info(f"  [{i}] {d.deck_type()} (Serial: {d.get_serial_number()})")
-                d.close()
-            logging.info("Using first device. Multi-device support coming soon!")
-
-        self.deck = decks[0]
-        self.deck.open()
+        self.deck = self.claim_deck(decks)
+        if self.deck is None:
+            logging.error(f"Stream Deck {self.serial} not found!")
+            return False
 
         try:
             self.deck.reset()
 
             # Read brightness setting from file if it exists
             brightness = 100  # Default brightness percentage (0-100)
-            brightness_file = ACTIONS_DIR / '.brightness'
+            brightness_file = self.brightness_file
             if brightness_file.exists():
                 try:
                     brightness_hex = brightness_file.read_text().strip()
@@ -326,7 +2132,7 @@ class StreamDeckDaemon:
             logging.error("This is usually a USB permissions issue.")
             logging.error("")
             logging.error("To fix this, run the USB permissions setup script:")
-            logging.error(f"  cd {ACTIONS_DIR}")
+            logging.error(f"  cd {self.config_dir}")
             logging.error("  ./setup-udev-rules.sh")
             logging.error("")
             logging.error("Then unplug and replug your Stream Deck, or run:")
@@ -339,14 +2145,21 @@ class StreamDeckDaemon:
                     self.deck.close()
                 except Exception:
                     pass
+                self.deck = None
             return False
         
         self.device_type, self.device_profile = self.get_device_profile(self.deck.deck_type())
+        self.encoder_settings = self.load_encoder_settings()
         self.setup_touch_zones()
-        
+        self.build_render_config()
+        self.writer = DeviceWriter(self.deck, on_error=self.on_write_error)
+
         self.save_device_info()
+        self.prewarm_svg_cache()
 
         logging.info(f"Connected to: {self.device_type}")
+        if self.serial is not None:
+            logging.info(f"  Serial: {self.serial} ({self.config_dir})")
         logging.info(f"  Buttons: {self.device_profile['buttons']}")
         if self.device_profile['dials'] > 0:
             logging.info(f"  Dials: {self.device_profile['dials']}")
@@ -356,6 +2169,11 @@ class StreamDeckDaemon:
         if self.device_profile['pedals'] > 0:
             logging.info(f"  Pedals: {self.device_profile['pedals']}")
 
+        self.register_callbacks()
+        self.device_connected = True
+        return True
+
+    def register_callbacks(self):
         if hasattr(self.deck, 'set_key_callback') and self.device_profile['buttons'] > 0:
             self.deck.set_key_callback(self.button_callback)
             logging.info("Button callbacks registered")
@@ -368,9 +2186,53 @@ class StreamDeckDaemon:
             self.deck.set_touchscreen_callback(self.touchscreen_callback)
             logging.info("Touchscreen callbacks registered")
 
+    def warm_connect(self):
+        """Reopen the deck we were driving and repaint it from the stored frames.
+
+        Skips reset(), the settings files, save_device_info() and rendering:
+        the same deck comes back with the same configuration, so the frames it
+        showed are still right. Returns False (with nothing opened) if that
+        deck is not present or there are no stored frames to show.
+        """
+        if self.deck_serial is None or not (self.key_frames or self.touchscreen_frames):
+            return False
+
+        deck = self.claim_deck(self.enumerate_decks(), serial=self.deck_serial)
+        if deck is None:
+            return False
+
+        self.deck = deck
+        self.writer = DeviceWriter(self.deck, on_error=self.on_write_error)
+        self.writer.submit(('brightness', None), self.current_brightness)
+        self.resend_frames()
+        self.register_callbacks()
         self.device_connected = True
         return True
 
+    def claim_deck(self, decks, serial=None):
+        """Open the deck this instance drives: the one with the given serial
+        number (default: ours), or without one the first deck no other
+        instance drives"""
+        serial = serial or self.serial
+        with StreamDeckDaemon.claim_lock:
+            taken = {d.deck_id for d in StreamDeckDaemon.instances if d is not self and d.deck is not None}
+            for deck in decks:
+                if deck.id() in taken:
+                    continue
+                try:
+                    deck.open()
+                    deck_serial = deck.get_serial_number()
+                    if serial is not None and deck_serial != serial:
+                        deck.close()
+                        continue
+                except Exception as e:
+                    logging.debug(f"Could not open {deck.id()}: {e}")
+                    continue
+                self.deck_id = deck.id()
+                self.deck_serial = deck_serial
+                return deck
+        return None
+
     def is_device_connected(self):
         """Check if the Stream Deck device is still connected"""
         if not self.deck:
@@ -388,17 +2250,99 @@ class StreamDeckDaemon:
             logging.debug(f"Device connection check failed: {e}")
             return False
 
+    def enumerate_decks(self):
+        return (self.device_manager or DeviceManager()).enumerate()
+
     def check_device_presence(self):
         """Actively check if any Stream Deck device is present via USB enumeration"""
         try:
-            decks = DeviceManager().enumerate()
+            decks = self.enumerate_decks()
             return len(decks) > 0
         except Exception as e:
             logging.debug(f"Device enumeration failed: {e}")
             return False
 
+    def start_hotplug_monitor(self):
+        """Follow plug/unplug through kernel uevents instead of enumerating every few seconds"""
+        if self.device_manager is not None:
+            return  # virtual decks: the periodic check notices unplug()/plug()
+        try:
+            self.hotplug = HotplugMonitor(self.on_hotplug)
+            logging.info("Watching for Stream Deck hotplug events")
+        except (OSError, AttributeError) as e:
+            logging.info(f"Hotplug events unavailable ({e}), checking for the device every {self.device_check_interval:.0f}s")
+
+    def on_hotplug(self, action):
+        """A Stream Deck was plugged in or removed (called from the monitor thread)"""
+        logging.debug(f"Hotplug: {action}")
+        self.hotplug_action = action
+        self.hotplug_wakeup.set()
+        if self.watcher:
+            self.watcher.wake()
+
+    def handle_hotplug(self):
+        """Act on the latest hotplug event, in the main loop"""
+        action = self.hotplug_action
+        self.hotplug_action = None
+
+        if action == 'remove':
+            if self.deck and self.is_device_connected():
+                return  # another deck went away
+            if self.deck:
+                logging.warning("⚠ Device unplugged - detected via hotplug event")
+                self.release_device()
+            self.device_removed = True
+        elif action == 'add' and not self.device_connected:
+            logging.info("✓ Device plugged in - reconnecting...")
+            # udev may still be applying permissions to the new node: the
+            # backoff's first few retries are tenths of a second apart
+            self.device_removed = False
+            self.reconnect.kick()
+        elif action == 'overflow':
+            # Events were lost: find out by enumeration what they would have said
+            device_present = self.check_device_presence()
+            if self.device_connected and not device_present:
+                logging.warning("⚠ Device unplugged - detected via USB enumeration")
+                self.release_device()
+                self.device_removed = True
+            elif not self.device_connected and device_present:
+                self.device_removed = False
+                self.reconnect.kick()
+
+    def on_write_error(self, e):
+        """A frame could not be written (called from the writer thread)"""
+        logging.error(f"Error writing to device: {e}")
+        # A failed transfer means the deck is gone or wedged: the main loop
+        # reconnects (the library reports e.g. "Failed to write out report")
+        if self.device_connected and isinstance(e, TransportError):
+            logging.warning("USB communication error detected - device may be disconnected")
+            self.device_connected = False
+            self.reconnect.lost()
+            self.hotplug_wakeup.set()
+            if self.watcher:
+                self.watcher.wake()
+
+    def close_writer(self, timeout=1.0):
+        """Stop the writer thread, first writing what is queued if the device still answers"""
+        if self.writer:
+            logging.info(f"Device writes: {self.writer.stats()}")
+            self.writer.close(timeout if self.device_connected else 0)
+            self.writer = None
+
+    def release_device(self):
+        """Let go of a deck that stopped answering or went away, leaving its display alone"""
+        self.device_connected = False
+        self.close_writer()
+        if self.deck:
+            try:
+                self.deck.close()
+            except Exception:
+                pass
+            self.deck = None
+
     def disconnect_device(self):
         """Safely disconnect from the device"""
+        self.close_writer()
         if self.deck:
             try:
                 self.deck.reset()
@@ -410,42 +2354,56 @@ class StreamDeckDaemon:
                 self.deck = None
                 self.device_connected = False
 
-    def attempt_reconnect(self):
-        """Attempt to reconnect to the Stream Deck device"""
-        current_time = time.time()
-
-        # Rate limit reconnection attempts
-        if current_time - self.last_reconnect_attempt < self.reconnect_interval:
+    def attempt_reconnect(self, force=False):
+        """Attempt to reconnect to the Stream Deck device, if the backoff says
+        an attempt is due (force: regardless)"""
+        if not force and not self.reconnect.due():
             return False
 
-        self.last_reconnect_attempt = current_time
-
         # Clean up existing connection
         if self.deck:
-            self.disconnect_device()
+            self.release_device()
 
-        logging.info("Attempting to reconnect to Stream Deck...")
+        logging.info(f"Attempting to reconnect to Stream Deck (attempt {self.reconnect.attempts + 1})...")
+        previous_type = self.device_type
 
         try:
-            if self.connect_device():
+            # The same deck again: repaint it from the stored native frames.
+            # Files changed while disconnected are picked up by the next file
+            # change check.
+            if self.warm_connect():
+                logging.info("✓ Reconnected to the same Stream Deck, restored displays from stored frames")
+            elif self.connect_device():
                 logging.info("✓ Successfully reconnected to Stream Deck!")
-                # Reload displays after reconnection
-                self.update_all_buttons()
-                self.update_touchscreen()
-                return True
+                if self.device_type == previous_type and self.resend_frames():
+                    logging.info("✓ Restored displays from stored frames")
+                else:
+                    self.key_frames = {}
+                    self.touchscreen_frames = {}
+                    self.invalidate_pages()
+                    if self.device_type != previous_type:
+                        self.widgets_mtime = None  # revalidate widget targets for the new model
+                        self.load_widgets()
+                    self.update_all_displays()
             else:
                 logging.debug("Reconnection attempt failed - no device found")
+                self.reconnect.failed()
                 return False
         except Exception as e:
             logging.debug(f"Reconnection attempt failed: {e}")
+            self.release_device()
+            self.reconnect.failed()
             return False
 
+        self.reconnect.succeeded()
+        return True
+
     def check_brightness_change(self):
         """Check if brightness file has changed and apply new brightness"""
-        if not self.deck or not self.device_connected:
+        if not self.writer or not self.device_connected:
             return
 
-        brightness_file = ACTIONS_DIR / '.brightness'
+        brightness_file = self.brightness_file
 
         try:
             if brightness_file.exists():
@@ -464,7 +2422,7 @@ class StreamDeckDaemon:
                         # Only apply if brightness has actually changed
                         if brightness != self.current_brightness:
                             self.current_brightness = brightness
-                            self.deck.set_brightness(brightness)
+                            self.writer.submit(('brightness', None), brightness)
                             logging.info(f"✓ Brightness changed to {brightness}%")
                     except Exception as e:
                         logging.warning(f"Could not read brightness file: {e}")
@@ -493,140 +2451,262 @@ class StreamDeckDaemon:
             "firmware": firmware,
             "profile": self.device_profile
         }
-        info_path = ACTIONS_DIR / ".device-info.json"
+        info_path = self.config_dir / ".device-info.json"
         try:
             with open(info_path, 'w') as f:
                 json.dump(info, f, indent=2)
         except Exception as e:
             logging.warning(f"Could not save device info: {e}")
 
-    def get_button_size(self):
-        """Get button dimensions from device profile"""
-        if self.device_profile:
-            return self.device_profile['button_size']
-        return (120, 120)
-    
-    def load_image_for_button(self, button_num):
-        """Load custom image for a button, or create default"""
+    def prewarm_svg_cache(self):
+        """Rasterize every SVG the current profile uses in a background thread"""
+        if not SVG_SUPPORT or not self.device_profile:
+            return
+
+        jobs = []
         btn_w, btn_h = self.get_button_size()
-        
-        svg_path = BUTTONS_DIR / f"button-{button_num}.svg"
-        if svg_path.exists():
-            img = load_svg_image(svg_path, btn_w, btn_h)
-            if img:
-                return img
-        
-        for ext in ['.png', '.jpg', '.jpeg']:
-            img_path = BUTTONS_DIR / f"button-{button_num}{ext}"
-            if img_path.exists():
-                try:
-                    img = Image.open(img_path)
-                    img = img.convert('RGB')
-                    img = resize_with_aspect_ratio(img, btn_w, btn_h)
-                    return img
-                except Exception as e:
-                    logging.error(f"Error loading {img_path}: {e}")
+        zone_w, zone_h = self.get_touch_zone_size()
+        targets = [(config, btn_w, btn_h) for config in self.render_config.buttons.values()]
+        targets += [(config, zone_w, zone_h) for config in self.render_config.zones.values()]
+        for config, width, height in targets:
+            svg_path = next((p for p in config.images if p.suffix.lower() == '.svg'), None)
+            if svg_path:
+                jobs.append((svg_path, width, height, config.icon_color, config.background or "#000000"))
+
+        if not jobs:
+            return
 
-        img = Image.new('RGB', (btn_w, btn_h), color='#1a1a1a')
-        draw = ImageDraw.Draw(img)
+        def worker():
+            start = time.time()
+            for svg_path, width, height, icon_color, bg_color in jobs:
+                load_svg_image(svg_path, width, height, icon_color, bg_color, cache=self.svg_cache)
+            logging.info(f"Pre-warmed {len(jobs)} SVG icons in {time.time() - start:.2f}s")
+
+        threading.Thread(target=worker, name="svg-prewarm", daemon=True).start()
+
+    def load_profile(self):
+        """(Re)load the profile manifest if it changed.
+
+        The whole file is parsed before it replaces the current profile, so
+        renders never see a half-applied manifest and a broken edit keeps the
+        previous one. Returns the targets ("button-N" / "touch-N") whose entry
+        changed.
+        """
+        path = next((p for p in self.profile_files if p.exists()), None)
+        identity = file_identity(path) if path else None
+        if identity == self.profile_identity:
+            return set()
+
+        profile = {'buttons': {}, 'touch': {}, 'dials': {}}
+        if path:
+            try:
+                if path.suffix == '.toml':
+                    if tomllib is None:
+                        raise RuntimeError("TOML profiles need Python 3.11+, use profile.json")
+                    with open(path, 'rb') as f:
+                        data = tomllib.load(f)
+                else:
+                    with open(path) as f:
+                        data = json.load(f)
+
+                for name, entry in data.get('buttons', {}).items():
+                    button_num = int(str(name).removeprefix('button-'))
+                    profile['buttons'][button_num] = parse_profile_entry(entry, path.parent, 'bottom', 24)
+                for name, entry in data.get('touch', {}).items():
+                    zone_name = str(name) if str(name).startswith('touch-') else f"touch-{name}"
+                    profile['touch'][zone_name] = parse_profile_entry(entry, path.parent, 'middle', 28)
+                for name, entry in data.get('dials', {}).items():
+                    dial_num = int(str(name).removeprefix('dial-'))
+                    profile['dials'][dial_num] = parse_dial_entry(entry)
+            except Exception as e:
+                logging.error(f"Error loading {path}: {e}")
+                return set()
+        self.profile_identity = identity
+
+        icons = {}
+        for button_num, entry in profile['buttons'].items():
+            if entry['icon']:
+                icons.setdefault(entry['icon'], set()).add(f"button-{button_num}")
+        for zone_name, entry in profile['touch'].items():
+            if entry['icon']:
+                icons.setdefault(entry['icon'], set()).add(zone_name)
+
+        old = self.profile
+        self.profile = profile
+        self.profile_icons = icons
+
+        changed = {
+            f"button-{n}" for n in old['buttons'].keys() | profile['buttons'].keys()
+            if old['buttons'].get(n) != profile['buttons'].get(n)
+        } | {
+            name for name in old['touch'].keys() | profile['touch'].keys()
+            if old['touch'].get(name) != profile['touch'].get(name)
+        }
+        if path:
+            logging.info(f"Loaded profile {path.name}: {len(profile['buttons'])} buttons, {len(profile['touch'])} touch zones")
+        return changed
 
-        font_size = max(24, btn_w // 3)
+    def read_sidecar_file(self, path):
+        """Stripped contents of a small config file, or None if it is missing or unreadable"""
         try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
+            with open(path, 'r') as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.error(f"Error loading {path}: {e}")
+            return None
 
-        draw.text((btn_w // 2, btn_h // 2), str(button_num), fill='#666666', font=font, anchor="mm")
+    def build_target_config(self, directory, name, entry, default_position, default_fontsize):
+        """Read the render inputs of one key or zone from its manifest entry or sidecar files"""
+        script = directory / f"{name}.sh"
+        has_script = directory == self.touch_dir and script.exists()
 
-        return img
+        if entry:
+            images = (entry['icon'],) if entry['icon'] else ()
+            return TargetConfig(
+                entry['label'], entry['position'], entry['fontsize'],
+                images, tuple(file_digest(p) for p in images),
+                entry['icon_color'], entry['background'], entry['color'], has_script)
 
-    def load_label_for_button(self, button_num):
-        """Load text label from file if it exists"""
-        label_path = BUTTONS_DIR / f"button-{button_num}.txt"
-        if label_path.exists():
-            try:
-                with open(label_path, 'r') as f:
-                    return f.read().strip()
-            except Exception as e:
-                logging.error(f"Error loading {label_path}: {e}")
-        return None
+        images = tuple(
+            directory / f"{name}{ext}" for ext in ['.svg', '.png', '.jpg', '.jpeg', '.gif']
+        )
+        sources = tuple(file_digest(p) for p in images)
+        images = tuple(p for p, digest in zip(images, sources) if digest)
+        sources = tuple(digest for digest in sources if digest)
+
+        label = self.read_sidecar_file(directory / f"{name}.txt") or None
 
-    def load_text_position_for_button(self, button_num):
-        """Load text position preference (top, middle, bottom)"""
-        position_path = BUTTONS_DIR / f"button-{button_num}-position.txt"
-        if position_path.exists():
+        position = (self.read_sidecar_file(directory / f"{name}-position.txt") or '').lower()
+        if position not in ['top', 'middle', 'bottom']:
+            position = default_position
+
+        fontsize = default_fontsize
+        fontsize_path = directory / f"{name}-fontsize.txt"
+        fontsize_text = self.read_sidecar_file(fontsize_path)
+        if fontsize_text is not None:
             try:
-                with open(position_path, 'r') as f:
-                    position = f.read().strip().lower()
-                    if position in ['top', 'middle', 'bottom']:
-                        return position
-            except Exception as e:
-                logging.error(f"Error loading {position_path}: {e}")
-        return 'bottom'  # Default to bottom
+                if 10 <= int(fontsize_text) <= 60:
+                    fontsize = int(fontsize_text)
+            except ValueError as e:
+                logging.error(f"Error loading {fontsize_path}: {e}")
+
+        return TargetConfig(label, position, fontsize, images, sources, '#FFFFFF', None, None, has_script)
+
+    def build_button_config(self, button_num, page='main'):
+        """Render inputs of a button (defaults: label at the bottom, 24px).
+
+        The profile manifest describes the main page.
+        """
+        entry = self.profile['buttons'].get(button_num) if page == 'main' else None
+        return self.build_target_config(self.page_dir(page), f"button-{button_num}", entry, 'bottom', 24)
+
+    def build_touch_zone_config(self, zone_name):
+        """Render inputs of a touch zone (defaults: label in the middle, 28px)"""
+        entry = self.profile['touch'].get(zone_name)
+        return self.build_target_config(self.touch_dir, zone_name, entry, 'middle', 28)
+
+    def page_buttons(self, page):
+        """(page, button_num) pairs of every key on a page"""
+        button_count = self.device_profile['buttons'] if self.device_profile else 0
+        return [(page, n) for n in range(1, button_count + 1)]
+
+    def build_render_config(self, buttons=None, zone_names=None):
+        """Re-read the given keys ((page, button_num) pairs) and zones, all if both are None,
+        and swap in a new snapshot"""
+        if buttons is None and zone_names is None:
+            self.render_config = RenderConfig(
+                {button: self.build_button_config(button[1], button[0])
+                 for page in self.pages for button in self.page_buttons(page)},
+                {zone['name']: self.build_touch_zone_config(zone['name']) for zone in self.touch_zones})
+            return
 
-    def load_font_size_for_button(self, button_num):
-        """Load font size for button text"""
-        fontsize_path = BUTTONS_DIR / f"button-{button_num}-fontsize.txt"
-        if fontsize_path.exists():
+        self.render_config = self.render_config.updated(
+            {(page, n): self.build_button_config(n, page) for page, n in buttons or ()},
+            {name: self.build_touch_zone_config(name) for name in zone_names or ()})
+
+    def button_config(self, button_num, page=None):
+        """Render inputs of a button on a page (default: the current page) from the current snapshot"""
+        page = page or self.current_page
+        config = self.render_config.buttons.get((page, button_num))
+        if config is None:
+            config = self.build_button_config(button_num, page)
+        return config
+
+    def touch_zone_config(self, zone_name):
+        """Render inputs of a touch zone from the current snapshot"""
+        config = self.render_config.zones.get(zone_name)
+        if config is None:
+            config = self.build_touch_zone_config(zone_name)
+        return config
+
+    def load_config_image(self, config, width, height):
+        """Load the first usable image of a key or zone, or None"""
+        for path in config.images:
+            if path.suffix.lower() == '.svg':
+                img = load_svg_image(path, width, height, config.icon_color, config.background or "#000000",
+                                     cache=self.svg_cache)
+                if img:
+                    return img
+                continue
             try:
-                with open(fontsize_path, 'r') as f:
-                    fontsize = int(f.read().strip())
-                    if 10 <= fontsize <= 60:
-                        return fontsize
+                img = Image.open(path)
+                img = img.convert('RGB')
+                return resize_with_aspect_ratio(img, width, height)
             except Exception as e:
-                logging.error(f"Error loading {fontsize_path}: {e}")
-        return 24  # Default font size
+                logging.error(f"Error loading {path}: {e}")
+        return None
+
+    def get_button_size(self):
+        """Get button dimensions from device profile"""
+        if self.device_profile:
+            return self.device_profile['button_size']
+        return (120, 120)
+    
+    def load_image_for_button(self, button_num, config=None):
+        """Load custom image for a button, or create default"""
+        btn_w, btn_h = self.get_button_size()
+        config = config or self.button_config(button_num)
 
-    def wrap_text(self, text, font, max_width):
-        """Wrap or truncate text to fit width"""
-        words = text.split()
-        lines = []
-        current_line = []
+        img = self.load_config_image(config, btn_w, btn_h)
+        if img:
+            return img
 
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            bbox = font.getbbox(test_line)
-            width = bbox[2] - bbox[0]
+        img = Image.new('RGB', (btn_w, btn_h), color=config.background or '#1a1a1a')
+        draw = ImageDraw.Draw(img)
 
-            if width <= max_width:
-                current_line.append(word)
-            else:
-                if current_line:
-                    lines.append(' '.join(current_line))
-                    current_line = [word]
-                else:
-                    # Word too long, truncate it
-                    lines.append(word[:8] + '...')
-                    current_line = []
+        font = get_font(FONT_BOLD, max(24, btn_w // 3))
 
-        if current_line:
-            lines.append(' '.join(current_line))
+        draw.text((btn_w // 2, btn_h // 2), str(button_num), fill='#666666', font=font, anchor="mm")
 
-        # Limit to 2 lines max
-        return lines[:2]
+        return img
 
-    def render_button(self, button_num):
+    def render_button(self, button_num, page=None, config=None):
         """Render a button with image and optional text label"""
-        # Load base image
-        img = self.load_image_for_button(button_num)
+        # Load base image, from one config snapshot for the whole render
+        config = config or self.button_config(button_num, page)
+        img = self.load_image_for_button(button_num, config)
+        return self.draw_button_label(img, button_num, config)
+
+    def draw_button_label(self, img, button_num, config=None):
+        """Overlay the button's text label (if any) onto img"""
         btn_w, btn_h = self.get_button_size()
 
-        # Load label and overlay if exists
-        label = self.load_label_for_button(button_num)
+        # Overlay the label if there is one
+        config = config or self.button_config(button_num)
+        label = config.label
         if label:
-            position = self.load_text_position_for_button(button_num)
-            fontsize = self.load_font_size_for_button(button_num)
+            position = config.position
+            fontsize = config.fontsize
+            text_color = config.color or '#ffffff'
             draw = ImageDraw.Draw(img)
-            try:
-                font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", fontsize)
-            except:
-                font = ImageFont.load_default()
+            font = get_font(FONT_BOLD, fontsize)
 
             # Wrap text to fit button width (with small margin)
-            lines = self.wrap_text(label, font, btn_w - 5)
-
-            # Calculate line height based on font size
-            line_height = fontsize + 5
+            layout = layout_text(label, FONT_BOLD, fontsize, btn_w - 5)
+            lines = layout.lines
+            line_height = layout.line_height
             center_x = btn_w // 2
             center_y = btn_h // 2
 
@@ -638,7 +2718,7 @@ class StreamDeckDaemon:
 
                 y_offset = 5
                 for line in lines:
-                    draw.text((center_x, y_offset), line, fill='#ffffff', font=font, anchor="mt")
+                    draw.text((center_x, y_offset), line, fill=text_color, font=font, anchor="mt")
                     y_offset += line_height
 
             elif position == 'middle':
@@ -649,7 +2729,7 @@ class StreamDeckDaemon:
 
                 y_offset = start_y
                 for line in lines:
-                    draw.text((center_x, y_offset), line, fill='#ffffff', font=font, anchor="mt")
+                    draw.text((center_x, y_offset), line, fill=text_color, font=font, anchor="mt")
                     y_offset += line_height
 
             else:  # bottom (default)
@@ -659,71 +2739,771 @@ class StreamDeckDaemon:
 
                 y_offset = btn_h - bg_height + 5
                 for line in lines:
-                    draw.text((center_x, y_offset), line, fill='#ffffff', font=font, anchor="mt")
+                    draw.text((center_x, y_offset), line, fill=text_color, font=font, anchor="mt")
                     y_offset += line_height
 
         return img
 
-    def update_all_buttons(self):
-        """Update all button displays"""
-        if not self.deck or not hasattr(self.deck, 'set_key_image'):
+    def get_key_image_format(self):
+        """Native key image format of the connected device"""
+        if self.deck and hasattr(self.deck, 'key_image_format'):
+            return self.deck.key_image_format()
+        return {"size": self.get_button_size(), "format": "JPEG", "flip": (False, False), "rotation": 0}
+
+    def get_touchscreen_image_format(self):
+        """Native touchscreen image format of the connected device.
+
+        Decks whose strip the library cannot draw on (the Neo's info strip
+        reports an empty format and ignores writes) get the JPEG default.
+        """
+        if self.deck and hasattr(self.deck, 'touchscreen_image_format'):
+            try:
+                image_format = self.deck.touchscreen_image_format()
+                if image_format.get('format'):
+                    return image_format
+            except Exception:
+                pass
+        ts = self.device_profile['touchscreen']
+        return {"size": (ts['width'], ts['height']), "format": "JPEG", "flip": (False, False), "rotation": 0}
+
+    def encode_key_frame(self, img):
+        """Encode a rendered button in the device's native key format"""
+        return to_native_format(img, self.get_key_image_format(), **self.encoder_settings['key'])
+
+    def encode_touchscreen_frame(self, img):
+        """Encode a rendered touchscreen image in the device's native format"""
+        image_format = dict(self.get_touchscreen_image_format(), size=img.size)
+        return to_native_format(img, image_format, **self.encoder_settings['touchscreen'])
+
+    def button_frame_key(self, button_num, page=None, config=None):
+        """Cache key covering every input render_button() depends on.
+
+        Images count by content, not path, so decks reading the same icon from
+        their own decks/<serial>/ directories share frames.
+        """
+        config = config or self.button_config(button_num, page)
+        config = config._replace(images=tuple(p.suffix.lower() for p in config.images))
+        return FrameCache.make_key(
+            FRAME_CACHE_VERSION, SVG_SUPPORT, button_num, tuple(config),
+            tuple(self.get_button_size()), repr(sorted(self.encoder_settings['key'].items())),
+            repr(sorted(self.get_key_image_format().items())),
+        )
+
+    def load_animation(self, path, size, image_format, decorate=None, target='key', decoration=()):
+        """Decode an animated GIF/PNG once into native frames, or None if not animated.
+
+        decorate(img) is applied to every frame (labels, zone dividers) before
+        encoding; decoration holds everything it draws from (label text,
+        position, ...). Decoded animations are reused until the file or the
+        decoration changes.
+        """
+        encoder = self.encoder_settings[target]
+        identity = (file_identity(path), tuple(size), repr(sorted(image_format.items())),
+                    repr(sorted(encoder.items())), decoration)
+        if identity[0] is None:
+            return None
+
+        cached = self.animation_cache.get(str(path))
+        if cached and cached[0] == identity:
+            return cached[1]
+
+        animation = None
+        try:
+            with Image.open(path) as img:
+                if getattr(img, 'is_animated', False) and img.n_frames > 1:
+                    frames = []
+                    durations = []
+                    first_image = None
+                    for frame in ImageSequence.Iterator(img):
+                        if len(frames) >= self.max_animation_frames:
+                            break
+                        rendered = resize_with_aspect_ratio(frame.convert('RGB'), *size)
+                        if decorate:
+                            rendered = decorate(rendered)
+                        if first_image is None:
+                            first_image = rendered
+                        frames.append(to_native_format(rendered, image_format, **encoder))
+                        durations.append((frame.info.get('duration') or 100) / 1000.0)
+                    animation = Animation(frames, durations, first_image)
+                    logging.info(f"Loaded animation {path.name}: {len(frames)} frames")
+        except Exception as e:
+            logging.error(f"Error loading animation {path}: {e}")
+
+        self.animation_cache[str(path)] = (identity, animation)
+        return animation
+
+    def load_animation_for_button(self, button_num, page=None, config=None):
+        """Animation for a button from button-N.gif or an animated button-N.png"""
+        config = config or self.button_config(button_num, page)
+        for path in animation_candidates(config.images):
+            animation = self.load_animation(
+                path, self.get_button_size(), self.get_key_image_format(),
+                decorate=lambda img: self.draw_button_label(img, button_num, config),
+                decoration=(config.label, config.position, config.fontsize, config.color))
+            if animation:
+                return animation
+        return None
+
+    def push_frame(self, target, frame, is_current=None):
+        """Queue one native frame on the device writer.
+
+        target is ('key', index), ('zone', name) or ('rect', (x, y, width, height))
+        on the touchscreen. If is_current() is False when the frame's turn to
+        be written comes, the frame is stale and dropped.
+        """
+        writer = self.writer
+        if not writer or not self.device_connected:
             return
 
-        if not self.device_profile or self.device_profile['buttons'] == 0:
+        # Checked before queueing too: a stale frame must not replace a queued
+        # current one (latest wins) or be remembered as what the key shows
+        if is_current and not is_current():
             return
 
+        kind, name = target
+        if kind == 'key':
+            writer.submit(target, frame, is_current)
+            self.key_frames[name] = frame
+        else:
+            if kind == 'zone':
+                zone = next(z for z in self.touch_zones if z['name'] == name)
+                rect = (zone['x'], 0, zone['width'], self.device_profile['touchscreen']['height'])
+            else:
+                rect = tuple(name)
+            writer.submit(('rect', rect), frame, is_current)
+            self.touchscreen_frames.pop(rect, None)
+            self.touchscreen_frames[rect] = frame
+
+    def start_frame_server(self):
+        """Listen on the frame socket for frames pushed by external producers"""
         try:
-            key_count = min(self.deck.key_count(), self.device_profile['buttons'])
-            for key in range(key_count):
-                button_num = key + 1
-                img = self.render_button(button_num)
+            if self.frame_socket.exists():
+                self.frame_socket.unlink()
+            server = socketserver.ThreadingUnixStreamServer(str(self.frame_socket), FramePushHandler)
+            os.chmod(self.frame_socket, 0o600)
+        except OSError as e:
+            logging.warning(f"Frame push socket disabled: {e}")
+            return
+
+        server.daemon_threads = True
+        server.deck_daemon = self
+        self.frame_server = server
+        threading.Thread(target=server.serve_forever, name="frame-server", daemon=True).start()
+        logging.info(f"Frame push socket: {self.frame_socket}")
+
+    def stop_frame_server(self):
+        if self.frame_server:
+            self.frame_server.shutdown()
+            self.frame_server.server_close()
+            self.frame_server = None
+            try:
+                self.frame_socket.unlink()
+            except OSError:
+                pass
+
+    def handle_frame_push(self, header, payload):
+        """Decode (if needed) and send one pushed frame; raises ValueError on bad requests.
+
+        header["target"] is "button-N", "touch-N" or "touchscreen" (with x, y,
+        width, height). header["format"] is "rgb" (raw width*height*3 bytes),
+        "image" (any format PIL reads) or "native" (already in the device's
+        native format, sent untouched).
+        """
+        if not self.deck or not self.device_connected:
+            raise ValueError("no device connected")
+
+        target = header.get('target', '')
+        fmt = header.get('format', 'image')
+        ts = self.device_profile.get('touchscreen')
+
+        if BUTTON_FILE_RE.match(target + '.'):
+            key = int(target.split('-')[1]) - 1
+            if not 0 <= key < self.device_profile['buttons']:
+                raise ValueError(f"no such button: {target}")
+            push_target = ('key', key)
+            size = tuple(self.get_button_size())
+        elif TOUCH_FILE_RE.match(target + '.') and ts:
+            zone = next((z for z in self.touch_zones if z['name'] == target), None)
+            if zone is None:
+                raise ValueError(f"no such touch zone: {target}")
+            push_target = ('zone', target)
+            size = self.get_touch_zone_size()
+        elif target == 'touchscreen' and ts:
+            rect = tuple(int(header[k]) for k in ('x', 'y', 'width', 'height'))
+            if rect[0] < 0 or rect[1] < 0 or rect[2] < 1 or rect[3] < 1 \
+                    or rect[0] + rect[2] > ts['width'] or rect[1] + rect[3] > ts['height']:
+                raise ValueError(f"rectangle {rect} outside the {ts['width']}x{ts['height']} touchscreen")
+            push_target = ('rect', rect)
+            size = rect[2:]
+        else:
+            raise ValueError(f"unknown target: {target!r}")
+
+        self.animator.stop(push_target)
+
+        if fmt == 'native':
+            frame = payload
+        else:
+            if fmt == 'rgb':
+                img = Image.frombytes('RGB', (int(header['width']), int(header['height'])), payload)
+            elif fmt == 'image':
+                img = Image.open(BytesIO(payload)).convert('RGB')
+            else:
+                raise ValueError(f"unknown format: {fmt!r}")
+            if img.size != size:
+                img = resize_with_aspect_ratio(img, *size)
+            if push_target[0] == 'key':
+                frame = self.encode_key_frame(img)
+            else:
+                frame = self.encode_touchscreen_frame(img)
+                if push_target[0] == 'zone':
+                    self.touch_zone_images[target] = img
+
+        self.push_frame(push_target, frame)
+
+    def load_widgets(self):
+        """(Re)load widgets.json: a list of {"widget", "target", "interval", ...options}"""
+        try:
+            mtime = self.widgets_file.stat().st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self.widgets_mtime:
+            return False
+        self.widgets_mtime = mtime
+
+        widgets = {}
+        if mtime is not None:
+            try:
+                with open(self.widgets_file) as f:
+                    entries = json.load(f)
+                for entry in entries:
+                    render = WIDGET_TYPES.get(entry.get('widget'))
+                    target = entry.get('target', '')
+                    if render is None or not (BUTTON_FILE_RE.match(target + '.') or TOUCH_FILE_RE.match(target + '.')):
+                        logging.warning(f"Ignoring widget entry: {entry}")
+                        continue
+                    if not self.has_widget_target(target):
+                        logging.warning(f"Ignoring widget for {target}: no such key or touch zone on this deck")
+                        continue
+                    options = {k: v for k, v in entry.items() if k not in ('widget', 'target', 'interval')}
+                    widgets[target] = Widget(target, float(entry.get('interval', 2)), render, options)
+            except Exception as e:
+                logging.error(f"Error loading {self.widgets_file}: {e}")
+                return False
+
+        # Keep state (history) of widgets whose definition did not change
+        for target, widget in widgets.items():
+            old = self.widgets.get(target)
+            if old and old.render is widget.render and old.options == widget.options:
+                widget.state = old.state
+
+        for target in set(self.widgets) | set(widgets):
+            self.animator.stop(self.widget_push_target(target))
+        self.widgets = widgets
+        if widgets:
+            logging.info(f"Widgets: {', '.join(f'{w.target}={w.render.__name__}' for w in widgets.values())}")
+        self.widget_wakeup.set()
+        return True
+
+    def register_widget(self, widget):
+        """Add a widget from Python code (e.g. a plugin) alongside widgets.json"""
+        self.widgets[widget.target] = widget
+        self.animator.stop(self.widget_push_target(widget.target))
+        self.start_widgets()
+        self.widget_wakeup.set()
+
+    def has_widget_target(self, target):
+        """Whether "button-N"/"touch-N" exists on the connected deck"""
+        if not self.device_profile:
+            return False
+        kind, name = self.widget_push_target(target)
+        if kind == 'key':
+            return 0 <= name < self.device_profile['buttons']
+        return any(zone['name'] == name for zone in self.touch_zones)
+
+    def widget_push_target(self, target):
+        """Map "button-N"/"touch-N" to the push_frame() target form"""
+        if target.startswith('button-'):
+            return ('key', int(target.split('-')[1]) - 1)
+        return ('zone', target)
+
+    def update_widget(self, widget, push=True):
+        """Render a widget, fit it to its key or zone and (optionally) push it.
+
+        Returns the native frame. Unchanged frames are not re-sent.
+        """
+        try:
+            img = widget.render(widget).convert('RGB')
+            kind, name = self.widget_push_target(widget.target)
+            if kind == 'key':
+                button_size = tuple(self.get_button_size())
+                if img.size != button_size:
+                    img = resize_with_aspect_ratio(img, *button_size)
+                img = self.draw_button_label(img, name + 1, self.button_config(name + 1, 'main'))
+                frame = self.encode_key_frame(img)
+            else:
+                index = next((i for i, z in enumerate(self.touch_zones) if z['name'] == name), None)
+                if index is None:
+                    return None
+                zone_size = self.get_touch_zone_size()
+                if img.size != zone_size:
+                    img = resize_with_aspect_ratio(img, *zone_size)
+                img = self.draw_zone_dividers(img, index)
+                frame = self.encode_touchscreen_frame(img)
+        except Exception as e:
+            logging.error(f"Error rendering widget {widget.target}: {e}")
+            return widget.frame
+
+        changed = frame != widget.frame
+        widget.image = img
+        widget.frame = frame
+        if kind == 'zone':
+            self.touch_zone_images[name] = img
+        if push and changed:
+            with self.page_switch_lock:
+                if kind == 'zone' or self.current_page == 'main':
+                    self.push_frame((kind, name), frame)
+        return frame
+
+    def start_widgets(self):
+        """Start the widget scheduler thread if there is anything to run"""
+        if self.widget_thread is None or not self.widget_thread.is_alive():
+            self.widget_thread = threading.Thread(target=self._run_widgets, name="widgets", daemon=True)
+            self.widget_thread.start()
+
+    def _run_widgets(self):
+        """Schedule widget updates; they run on the widget pool so a slow widget cannot stall others"""
+        while self.running:
+            now = time.monotonic()
+            next_due = now + 1.0
+            for widget in list(self.widgets.values()):
+                if widget.next_due <= now and not widget.busy:
+                    widget.busy = True
+                    widget.next_due = now + widget.interval
+                    self.get_widget_pool().submit(self._widget_task, widget)
+                next_due = min(next_due, widget.next_due)
+
+            self.widget_wakeup.wait(max(0.05, next_due - time.monotonic()))
+            self.widget_wakeup.clear()
+
+    def _widget_task(self, widget):
+        try:
+            if self.deck and self.device_connected:
+                self.update_widget(widget)
+        finally:
+            widget.busy = False
+
+    def render_button_frame(self, button_num, page=None):
+        """Return (native frame, animation or None) for a button, rendering only on a cache miss.
+
+        Has no effect on the device, so it is safe for pages not on screen.
+        Widgets belong to the main page.
+        """
+        page = page or self.current_page
+        widget = self.widgets.get(f"button-{button_num}") if page == 'main' else None
+        if widget and widget.frame:
+            return widget.frame, None
+        # A widget without a frame yet shows the key's files until the widget
+        # pool pushes its first frame; rendering it here could block on I/O
+
+        # One snapshot for the animation, the cache key and the render, so a
+        # frame is never stored under the key of another config
+        config = self.button_config(button_num, page)
+        animation = self.load_animation_for_button(button_num, page, config)
+        if animation:
+            return animation.frames[0], animation
+
+        key = self.button_frame_key(button_num, page, config)
+        data = self.frame_cache.get_or_create(
+            key, lambda: self.encode_key_frame(self.render_button(button_num, page, config)))
+        return data, None
+
+    def page_dir(self, page):
+        """Directory holding a page's button files"""
+        return self.buttons_dir if page == 'main' else self.pages_dir / page
+
+    def load_pages(self):
+        """Rescan pages/ for page directories. Returns True if the list changed."""
+        try:
+            names = sorted(d.name for d in self.pages_dir.iterdir() if d.is_dir() and d.name != 'main')
+        except OSError:
+            names = []
+        pages = ['main'] + names
+        if pages == self.pages:
+            return False
+
+        added = [page for page in pages if page not in self.pages]
+        removed = [page for page in self.pages if page not in pages]
+        self.pages = pages
+        for page in added:
+            if self.watcher:
+                try:
+                    self.watcher.add_directory(self.page_dir(page))
+                except OSError as e:
+                    logging.warning(f"Not watching page {page}: {e}")
+        self.build_render_config([button for page in added for button in self.page_buttons(page)])
+        self.invalidate_pages(removed)
+        if len(pages) > 1:
+            logging.info(f"Pages: {', '.join(pages)}")
+        return True
+
+    def invalidate_pages(self, pages=None):
+        """Drop cached renders of the given pages (all if None)"""
+        with self.page_lock:
+            self.page_epoch += 1
+            for page in list(self.page_frames) if pages is None else pages:
+                self.page_frames.pop(page, None)
+
+    def cache_page(self, page, rendered, epoch=None):
+        """Keep a rendered page, evicting the least recently used beyond max_page_cache_bytes"""
+        with self.page_lock:
+            if epoch is not None and epoch != self.page_epoch:
+                return
+            self.page_frames[page] = rendered
+            self.page_frames.move_to_end(page)
+            total = sum(r.nbytes for r in self.page_frames.values())
+            while total > self.max_page_cache_bytes and len(self.page_frames) > 1:
+                _, evicted = self.page_frames.popitem(last=False)
+                total -= evicted.nbytes
+
+    def render_page(self, page):
+        """Render and encode every key of a page on the render pool"""
+        pool = self.get_render_pool()
+        pending = [(n - 1, pool.submit(self.render_button_frame, n, page)) for _, n in self.page_buttons(page)]
+        frames = {}
+        animations = {}
+        for key, future in pending:
+            frames[key], animation = future.result()
+            if animation:
+                animations[key] = animation
+        return RenderedPage(frames, animations)
+
+    def prefetch_pages(self, pages):
+        """Render pages that are not cached yet in a background thread"""
+        with self.page_lock:
+            pages = [p for p in pages if p not in self.page_frames and p not in self.prefetching]
+            self.prefetching.update(pages)
+            epoch = self.page_epoch
+        if not pages:
+            return
+
+        def worker():
+            for page in pages:
+                try:
+                    start = time.perf_counter()
+                    self.cache_page(page, self.render_page(page), epoch)
+                    logging.debug(f"Prefetched page {page} in {(time.perf_counter() - start) * 1000:.0f} ms")
+                except Exception as e:
+                    logging.error(f"Error prefetching page {page}: {e}")
+                finally:
+                    with self.page_lock:
+                        self.prefetching.discard(page)
+
+        threading.Thread(target=worker, name="page-prefetch", daemon=True).start()
+
+    def prefetch_neighbor_pages(self):
+        """Prefetch the pages before and after the current one"""
+        if len(self.pages) < 2:
+            return
+        index = self.pages.index(self.current_page)
+        self.prefetch_pages([self.pages[(index + 1) % len(self.pages)], self.pages[index - 1]])
+
+    def resolve_page(self, target):
+        """Page name for "next", "prev", "main" or a page name, or None if unknown"""
+        target = target.strip()
+        index = self.pages.index(self.current_page)
+        if target == 'next':
+            return self.pages[(index + 1) % len(self.pages)]
+        if target in ('prev', 'previous'):
+            return self.pages[index - 1]
+        if target in self.pages:
+            return target
+        return None
+
+    def switch_page(self, target):
+        """Show another page of keys: a push of cached frames, rendering only if it was never prefetched"""
+        page = self.resolve_page(target)
+        if page is None:
+            logging.warning(f"Unknown page: {target!r}")
+            return False
+        with self.page_switch_lock:
+            if page == self.current_page or not self.deck:
+                return True
+
+            start = time.perf_counter()
+            with self.page_lock:
+                rendered = self.page_frames.get(page)
+                if rendered:
+                    self.page_frames.move_to_end(page)
+            cached = rendered is not None
+            if not cached:
+                rendered = self.render_page(page)
+                self.cache_page(page, rendered)
+
+            self.current_page = page
+            self.show_page(rendered)
+        logging.info(f"📄 Page {page} ({'cached' if cached else 'rendered'}, "
+                     f"{(time.perf_counter() - start) * 1000:.0f} ms)")
+        self.prefetch_neighbor_pages()
+        return True
+
+    def show_page(self, rendered):
+        """Push a rendered page to the keys and start its animations"""
+        frames = dict(rendered.frames)
+        if self.current_page == 'main':
+            for target, widget in self.widgets.items():
+                if target.startswith('button-') and widget.frame:
+                    frames[int(target.split('-')[1]) - 1] = widget.frame
+
+        for key in frames:
+            self.animator.stop(('key', key))
+        for key, frame in sorted(frames.items()):
+            self.push_frame(('key', key), frame)
+        for key, animation in rendered.animations.items():
+            self.animator.play(('key', key), animation)
+
+    def load_app_pages(self):
+        """(Re)load app-pages.json: {"<WM_CLASS instance or class>": "<page>", "default": "<page>"}"""
+        try:
+            mtime = self.app_pages_file.stat().st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self.app_pages_mtime:
+            return False
+        self.app_pages_mtime = mtime
 
-                buf = BytesIO()
-                img.save(buf, format='JPEG', quality=95)
+        app_pages = {}
+        if mtime is not None:
+            try:
+                with open(self.app_pages_file) as f:
+                    app_pages = {str(app).lower(): str(page) for app, page in json.load(f).items()}
+            except Exception as e:
+                logging.error(f"Error loading {self.app_pages_file}: {e}")
+                return False
+        self.app_pages = app_pages
+        self.active_app = None
+        self.prefetch_app_pages()
+        return True
 
+    def page_for_app(self, names):
+        """Page for a focused window's (instance, class), or None to leave the keys alone.
+
+        app-pages.json wins; otherwise a page named after the instance or class
+        is used, then the "default" entry.
+        """
+        for name in names:
+            if name in self.app_pages:
+                return self.app_pages[name]
+        for name in names:
+            if name in self.pages and name != 'main':
+                return name
+        return self.app_pages.get('default')
+
+    def prefetch_app_pages(self):
+        """Render every page that a window can switch to, so focus changes never render"""
+        pages = set(self.app_pages.values()) | set(self.pages[1:])
+        self.prefetch_pages([page for page in self.pages if page in pages])
+
+    def on_active_window(self, names):
+        """Focus moved to another application (called from the window source's thread).
+
+        The switch itself runs on the input dispatcher like every other page
+        switch, keeping rendering off the window source's thread.
+        """
+        if names == self.active_app:
+            return
+        self.active_app = names
+        page = self.page_for_app(names)
+        if page and page != self.current_page and self.deck and self.device_connected:
+            logging.info(f"Focused {names[-1]}: switching to page {page}")
+            self.dispatcher.submit(self.switch_page, page)
+
+    def start_window_source(self, source=None):
+        """Follow the focused window with source (an object with start(callback) and
+        stop()), or the first of WINDOW_SOURCES that works on this session"""
+        if source is None:
+            for source_type in WINDOW_SOURCES:
                 try:
-                    self.deck.set_key_image(key, buf.getvalue())
+                    source = source_type()
+                    break
                 except Exception as e:
-                    logging.error(f"Error setting button {button_num} image: {e}")
-                    # Mark device as disconnected on communication error
-                    if self.device_connected and ("hid" in str(e).lower() or "device" in str(e).lower() or "usb" in str(e).lower()):
-                        logging.warning("USB communication error detected - device may be disconnected")
-                        self.device_connected = False
-                    raise
+                    logging.info(f"{source_type.__name__} unavailable: {e}")
+            else:
+                logging.info("Per-application pages disabled (no focused-window source)")
+                return
+
+        if self.window_source:
+            self.window_source.stop()
+        self.window_source = source
+        source.start(self.on_active_window)
+        logging.info(f"Following the focused window with {type(source).__name__}")
+
+    def get_render_pool(self):
+        """Thread pool for rendering; PIL releases the GIL while decoding, resizing and encoding"""
+        if self.render_pool is None:
+            self.render_pool = ThreadPoolExecutor(
+                max_workers=self.render_workers, thread_name_prefix="render")
+        return self.render_pool
+
+    def get_widget_pool(self):
+        """Thread pool for widget updates, separate from the render pool"""
+        if self.widget_pool is None:
+            self.widget_pool = ThreadPoolExecutor(
+                max_workers=self.widget_workers, thread_name_prefix="widget")
+        return self.widget_pool
+
+    def update_all_displays(self):
+        """Repaint every key and the touchscreen, rendering in parallel.
+
+        Touch zones are queued before the keys are pushed so they render while
+        the key frames go out. Logs how long it took until the first and the
+        last frame were queued on the device writer.
+        """
+        start = time.perf_counter()
+        pending_zones = self.submit_touch_zone_renders()
+        first_frame = self.update_buttons()
+        strip_frame = self.update_touchscreen(pending=pending_zones)
+        first_frame = first_frame or strip_frame
+
+        if first_frame:
+            logging.info(
+                f"Displays queued: first frame {(first_frame - start) * 1000:.0f} ms, "
+                f"all frames {(time.perf_counter() - start) * 1000:.0f} ms "
+                f"({self.render_workers} render threads)")
+
+    def resend_frames(self):
+        """Queue the last sent native frames again, with no rendering or encoding.
+
+        Returns False if there is nothing stored.
+        """
+        if not self.writer or not (self.key_frames or self.touchscreen_frames):
+            return False
+
+        for key, frame in sorted(self.key_frames.items()):
+            self.writer.submit(('key', key), frame)
+        for rect, frame in list(self.touchscreen_frames.items()):
+            self.writer.submit(('rect', rect), frame)
+        return True
+
+    def update_all_buttons(self):
+        """Update all button displays"""
+        self.update_buttons()
+
+    def update_buttons(self, button_nums=None):
+        """Render and send the given buttons (1-indexed), or all buttons if None.
+
+        Buttons are rendered on the render pool and queued on the device writer
+        in key order as soon as each is ready. Returns the perf_counter() time
+        the first frame was queued.
+        """
+        with self.page_switch_lock:
+            return self._update_buttons(button_nums)
+
+    def _update_buttons(self, button_nums):
+        if not self.deck or not self.writer:
+            return None
+
+        if not self.device_profile or self.device_profile['buttons'] == 0:
+            return None
+
+        first_frame = None
+        page = self.current_page
+        with self.page_lock:
+            cached = self.page_frames.get(page)
+        frames = dict(cached.frames) if cached else {}
+        animations = dict(cached.animations) if cached else {}
+        try:
+            key_count = min(self.deck.key_count(), self.device_profile['buttons'])
+            pool = self.get_render_pool()
+            pending = [
+                (key, pool.submit(self.render_button_frame, key + 1, page))
+                for key in range(key_count)
+                if button_nums is None or key + 1 in button_nums
+            ]
+
+            for key, future in pending:
+                button_num = key + 1
+                frame, animation = future.result()
+                frames[key] = frame
+                animations.pop(key, None)
+                if animation:
+                    animations[key] = animation
+                else:
+                    self.animator.stop(('key', key))
+
+                self.writer.submit(('key', key), frame)
+                self.key_frames[key] = frame
+                if animation:
+                    self.animator.play(('key', key), animation)
+                if first_frame is None:
+                    first_frame = time.perf_counter()
         except Exception as e:
             logging.error(f"Error updating buttons: {e}")
-            self.device_connected = False
+            return first_frame
+
+        if len(frames) == key_count:
+            self.cache_page(page, RenderedPage(frames, animations))
+        return first_frame
 
     def button_callback(self, deck, key, state):
+        """Queue a button event (HID reader thread: nothing that can block)"""
+        self.dispatcher.submit(self.handle_button, key, state)
+
+    def dial_callback(self, deck, dial, event, value):
+        """Queue a dial event (HID reader thread: nothing that can block)"""
+        self.dispatcher.submit(self.handle_dial, dial, event, value)
+
+    def touchscreen_callback(self, deck, event_type, value):
+        """Queue a touchscreen event (HID reader thread: nothing that can block)"""
+        self.dispatcher.submit(self.handle_touchscreen, event_type, value)
+
+    def handle_button(self, key, state):
         """Handle button press/release"""
         if state:  # Only on press, not release
             button_num = key + 1  # 0-indexed to 1-indexed
-            script = BUTTONS_DIR / f"button-{button_num}.sh"
+            script = self.page_dir(self.current_page) / f"button-{button_num}.sh"
 
             logging.info(f"Button {button_num} pressed")
             self.execute_script(script, f"Button {button_num} Pressed")
 
     def trigger_dial_longpress(self, dial, dial_num):
-        """Trigger long press for a dial (called by timer)"""
+        """Trigger long press for a dial (timer, through the dispatcher)"""
         # Check if dial is still pressed and hasn't already triggered
         if dial in self.dial_press_times and not self.dial_longpress_triggered.get(dial, False):
-            script = DIALS_DIR / f"dial-{dial_num}-longpress.sh"
+            script = self.dials_dir / f"dial-{dial_num}-longpress.sh"
             press_duration = time.time() - self.dial_press_times[dial]
             logging.info(f"Dial {dial_num} long pressed ({press_duration:.2f}s)")
             self.execute_script(script, f"Dial {dial_num} Long Press")
             self.dial_longpress_triggered[dial] = True
 
-    def trigger_touch_longpress(self, zone_name):
-        """Trigger long press for a touchscreen zone (called by timer)"""
-        # Check if zone is still pressed and hasn't already triggered
-        if zone_name in self.touch_press_times and not self.touch_longpress_triggered.get(zone_name, False):
-            script = TOUCH_DIR / f"{zone_name}-longpress.sh"
-            press_duration = time.time() - self.touch_press_times[zone_name]
-            logging.info(f"Touchscreen zone {zone_name} long pressed ({press_duration:.2f}s)")
-            self.execute_script(script, f"{zone_name.replace('-', ' ').title()} Long Press")
-            self.touch_longpress_triggered[zone_name] = True
+    def flush_dial_turn(self, dial):
+        """Run the action for the ticks merged since the coalescing window opened"""
+        self.run_dial_turn(dial, self.dial_turns.pop(dial, 0))
 
-    def dial_callback(self, deck, dial, event, value):
+    def run_dial_turn(self, dial, ticks):
+        """Run dial-N-cw.sh or dial-N-ccw.sh once for a net turn of ticks.
+
+        The script gets the number of steps as $1 and the signed steps in
+        STREAMDECK_DIAL_DELTA; with acceleration, steps = ticks ** acceleration.
+        """
+        if ticks == 0:
+            return
+        dial_num = dial + 1
+        settings = self.profile['dials'].get(dial_num)
+        acceleration = settings['acceleration'] if settings else 1.0
+        steps = max(1, round(abs(ticks) ** acceleration))
+
+        if ticks > 0:  # Clockwise
+            script = self.dials_dir / f"dial-{dial_num}-cw.sh"
+            logging.info(f"Dial {dial_num} rotated clockwise ({steps} steps)")
+            description = f"Dial {dial_num} Rotate CW"
+        else:  # Counter-clockwise
+            script = self.dials_dir / f"dial-{dial_num}-ccw.sh"
+            logging.info(f"Dial {dial_num} rotated counter-clockwise ({steps} steps)")
+            description = f"Dial {dial_num} Rotate CCW"
+        self.execute_script(script, description, args=[str(steps)],
+                            env={"STREAMDECK_DIAL_DELTA": str(steps if ticks > 0 else -steps)})
+
+    def handle_dial(self, dial, event, value):
         """Handle dial rotation and press (including long press)"""
         dial_num = dial + 1  # 0-indexed to 1-indexed
 
@@ -733,14 +3513,17 @@ class StreamDeckDaemon:
 
         # Handle TURN events (rotation)
         if event_name == "TURN":
-            if value > 0:  # Clockwise
-                script = DIALS_DIR / f"dial-{dial_num}-cw.sh"
-                logging.info(f"Dial {dial_num} rotated clockwise")
-                self.execute_script(script, f"Dial {dial_num} Rotate CW")
-            else:  # Counter-clockwise
-                script = DIALS_DIR / f"dial-{dial_num}-ccw.sh"
-                logging.info(f"Dial {dial_num} rotated counter-clockwise")
-                self.execute_script(script, f"Dial {dial_num} Rotate CCW")
+            settings = self.profile['dials'].get(dial_num)
+            if settings and settings['coalesce_ms']:
+                # Merge the ticks of a fast turn into one action
+                if dial in self.dial_turns:
+                    self.dial_turns[dial] += value
+                else:
+                    self.dial_turns[dial] = value
+                    self.timers.schedule(settings['coalesce_ms'] / 1000.0,
+                                         self.dispatcher.submit, self.flush_dial_turn, dial)
+            else:
+                self.run_dial_turn(dial, value)
 
         # Handle PUSH events (press/release based on value True/False)
         elif event_name == "PUSH":
@@ -750,10 +3533,8 @@ class StreamDeckDaemon:
                 self.dial_longpress_triggered[dial] = False
 
                 # Start timer to trigger long press after 0.5 seconds
-                timer = threading.Timer(0.5, self.trigger_dial_longpress, args=(dial, dial_num))
-                timer.daemon = True
-                timer.start()
-                self.dial_longpress_timers[dial] = timer
+                self.dial_longpress_timers[dial] = self.timers.schedule(
+                    0.5, self.dispatcher.submit, self.trigger_dial_longpress, dial, dial_num)
 
                 logging.info(f"Dial {dial_num} pushed (tracking for long press)")
             else:  # False = released
@@ -772,201 +3553,69 @@ class StreamDeckDaemon:
 
                     if not longpress_was_triggered:
                         # It was a short press
-                        script = DIALS_DIR / f"dial-{dial_num}-press.sh"
+                        script = self.dials_dir / f"dial-{dial_num}-press.sh"
                         logging.info(f"Dial {dial_num} pressed (short)")
                         self.execute_script(script, f"Dial {dial_num} Press")
                     else:
                         logging.info(f"Dial {dial_num} released (long press already triggered)")
 
-    def touchscreen_callback(self, deck, event_type, value):
-        """Handle touchscreen gestures: tap, swipe, long swipe"""
+    def handle_touchscreen(self, event_type, value):
+        """Handle touchscreen gestures: tap, long press, swipe, long swipe"""
         event_name = event_type.name if hasattr(event_type, 'name') else str(event_type)
-        current_time = time.time()
-
         logging.info(f"Touchscreen event: {event_name}, value: {value}")
-
-        if event_name == "DRAG":
-            time_since_last = current_time - self.swipe_last_event_time
-            
-            if not self.swipe_in_progress or time_since_last > self.swipe_reset_timeout:
-                self.swipe_in_progress = True
-                self.swipe_start_x = value.get('x', 0)
-                self.swipe_start_y = value.get('y', 0)
-                self.swipe_min_x = self.swipe_start_x
-                self.swipe_max_x = self.swipe_start_x
-
-                x = self.swipe_start_x
-                for zone in self.touch_zones:
-                    if zone['x'] <= x < zone['x'] + zone['width']:
-                        zone_name = zone['name']
-                        if zone_name in self.touch_longpress_timers:
-                            self.touch_longpress_timers[zone_name].cancel()
-                        self.touch_press_times[zone_name] = current_time
-                        self.touch_longpress_triggered[zone_name] = False
-                        timer = threading.Timer(0.5, self.trigger_touch_longpress, args=(zone_name,))
-                        timer.daemon = True
-                        timer.start()
-                        self.touch_longpress_timers[zone_name] = timer
-                        break
-
-            current_x = value.get('x', 0)
-            current_x_out = value.get('x_out', current_x)
-            self.swipe_end_x = current_x_out
-            self.swipe_end_y = value.get('y_out', value.get('y', 0))
-            self.swipe_last_event_time = current_time
-
-            self.swipe_min_x = min(self.swipe_min_x, current_x, current_x_out)
-            self.swipe_max_x = max(self.swipe_max_x, current_x, current_x_out)
-            
-            dx = self.swipe_end_x - self.swipe_start_x
-            dy = self.swipe_end_y - self.swipe_start_y
-            
-            if abs(dx) > self.swipe_min_distance or abs(dy) > self.swipe_min_distance:
-                for zone in self.touch_zones:
-                    x = self.swipe_start_x
-                    if zone['x'] <= x < zone['x'] + zone['width']:
-                        zone_name = zone['name']
-                        if zone_name in self.touch_longpress_timers:
-                            self.touch_longpress_timers[zone_name].cancel()
-                            del self.touch_longpress_timers[zone_name]
-                        if zone_name in self.touch_press_times:
-                            del self.touch_press_times[zone_name]
-                        if zone_name in self.touch_longpress_triggered:
-                            del self.touch_longpress_triggered[zone_name]
-                        break
-
-            if self.swipe_completion_timer:
-                self.swipe_completion_timer.cancel()
-            self.swipe_completion_timer = threading.Timer(0.2, self._complete_swipe)
-            self.swipe_completion_timer.daemon = True
-            self.swipe_completion_timer.start()
+        if not self.gestures:
             return
 
-        if event_name == "SHORT":
+        if event_name == "DRAG":
             x = value.get('x', 0)
-
-            if self.swipe_completion_timer:
-                self.swipe_completion_timer.cancel()
-                self.swipe_completion_timer = None
-            
-            if self.swipe_in_progress:
-                dx = self.swipe_end_x - self.swipe_start_x
-                dy = self.swipe_end_y - self.swipe_start_y
-                zones_crossed = abs(dx) / 200.0
-                
-                logging.info(f"Touch released: dx={dx}, dy={dy}, zones={zones_crossed:.1f}")
-                
-                if abs(dx) > self.swipe_min_distance or abs(dy) > self.swipe_min_distance:
-                    self._execute_swipe(dx, dy, zones_crossed)
-                    self.swipe_in_progress = False
-                    return
-                
-                self.swipe_in_progress = False
-            
-            for zone in self.touch_zones:
-                if zone['x'] <= x < zone['x'] + zone['width']:
-                    zone_name = zone['name']
-                    if zone_name in self.touch_longpress_timers:
-                        self.touch_longpress_timers[zone_name].cancel()
-                        del self.touch_longpress_timers[zone_name]
-                    longpress_was_triggered = self.touch_longpress_triggered.get(zone_name, False)
-                    if zone_name in self.touch_press_times:
-                        del self.touch_press_times[zone_name]
-                    if zone_name in self.touch_longpress_triggered:
-                        del self.touch_longpress_triggered[zone_name]
-                    if not longpress_was_triggered:
-                        script = TOUCH_DIR / f"{zone_name}.sh"
-                        logging.info(f"Tap on {zone_name}")
-                        self.execute_script(script, f"{zone_name.replace('-', ' ').title()} Tap")
-                    break
-
+            y = value.get('y', 0)
+            self.gestures.drag(x, y, value.get('x_out', x), value.get('y_out', y))
+        elif event_name == "SHORT":
+            self.gestures.tap(value.get('x', 0))
         elif event_name == "LONG":
-            x = value.get('x', 0)
-
-            if self.swipe_completion_timer:
-                self.swipe_completion_timer.cancel()
-                self.swipe_completion_timer = None
-
-            self.swipe_in_progress = False
-            
-            for zone in self.touch_zones:
-                if zone['x'] <= x < zone['x'] + zone['width']:
-                    zone_name = zone['name']
-                    if zone_name in self.touch_longpress_timers:
-                        self.touch_longpress_timers[zone_name].cancel()
-                        del self.touch_longpress_timers[zone_name]
-                    longpress_was_triggered = self.touch_longpress_triggered.get(zone_name, False)
-                    if zone_name in self.touch_press_times:
-                        del self.touch_press_times[zone_name]
-                    if zone_name in self.touch_longpress_triggered:
-                        del self.touch_longpress_triggered[zone_name]
-                    if not longpress_was_triggered:
-                        script = TOUCH_DIR / f"{zone_name}-longpress.sh"
-                        logging.info(f"Long press on {zone_name}")
-                        self.execute_script(script, f"{zone_name.replace('-', ' ').title()} Long Press")
-                    break
-
-    def _complete_swipe(self):
-        if not self.swipe_in_progress:
+            self.gestures.long_press(value.get('x', 0))
+
+    def run_gesture(self, gesture):
+        """Run the script for a gesture decided by the recognizer"""
+        if gesture.kind == 'longswipe':
+            script = self.touch_dir / f"longswipe-{gesture.direction}.sh"
+            logging.info(f"Long swipe {gesture.direction} ({gesture.distance}px, {gesture.velocity:.0f}px/s)")
+            self.execute_script(script, f"Long Swipe {gesture.direction.title()}")
             return
 
-        dx = self.swipe_end_x - self.swipe_start_x
-        dy = self.swipe_end_y - self.swipe_start_y
-        total_span = self.swipe_max_x - self.swipe_min_x
-        zones_crossed = total_span / 200.0
-
-        if total_span > self.swipe_min_distance or abs(dy) > self.swipe_min_distance:
-            self._execute_swipe(dx, dy, zones_crossed)
-
-        self.swipe_in_progress = False
-        self.swipe_completion_timer = None
-
-    def _execute_swipe(self, dx, dy, zones_crossed):
-        start_x = self.swipe_start_x
-        
-        ts_width = 800
-        if self.device_profile and self.device_profile.get('touchscreen'):
-            ts_width = self.device_profile['touchscreen']['width']
-        
-        edge_threshold = ts_width // 10
-        is_edge_swipe_right = start_x < edge_threshold and dx > 50
-        is_edge_swipe_left = start_x > (ts_width - edge_threshold) and dx < -50
-        
-        if is_edge_swipe_right:
-            script = TOUCH_DIR / "longswipe-right.sh"
-            logging.info("Long swipe right (from left edge)")
-            self.execute_script(script, "Long Swipe Right")
-        elif is_edge_swipe_left:
-            script = TOUCH_DIR / "longswipe-left.sh"
-            logging.info("Long swipe left (from right edge)")
-            self.execute_script(script, "Long Swipe Left")
+        zone_title = gesture.zone.replace('-', ' ').title()
+        if gesture.kind == 'tap':
+            script = self.touch_dir / f"{gesture.zone}.sh"
+            logging.info(f"Tap on {gesture.zone}")
+            self.execute_script(script, f"{zone_title} Tap")
+        elif gesture.kind == 'longpress':
+            script = self.touch_dir / f"{gesture.zone}-longpress.sh"
+            logging.info(f"Long press on {gesture.zone}")
+            self.execute_script(script, f"{zone_title} Long Press")
         else:
-            x = self.swipe_start_x
-            for zone in self.touch_zones:
-                if zone['x'] <= x < zone['x'] + zone['width']:
-                    zone_title = zone['name'].replace('-', ' ').title()
-                    if abs(dx) > abs(dy):
-                        if dx > 0:
-                            script = TOUCH_DIR / f"{zone['name']}-swipe-right.sh"
-                            logging.info(f"Swipe right in {zone['name']}")
-                            self.execute_script(script, f"{zone_title} Swipe Right")
-                        else:
-                            script = TOUCH_DIR / f"{zone['name']}-swipe-left.sh"
-                            logging.info(f"Swipe left in {zone['name']}")
-                            self.execute_script(script, f"{zone_title} Swipe Left")
-                    else:
-                        if dy > 0:
-                            script = TOUCH_DIR / f"{zone['name']}-swipe-down.sh"
-                            logging.info(f"Swipe down in {zone['name']}")
-                            self.execute_script(script, f"{zone_title} Swipe Down")
-                        else:
-                            script = TOUCH_DIR / f"{zone['name']}-swipe-up.sh"
-                            logging.info(f"Swipe up in {zone['name']}")
-                            self.execute_script(script, f"{zone_title} Swipe Up")
-                    break
+            script = self.touch_dir / f"{gesture.zone}-swipe-{gesture.direction}.sh"
+            logging.info(f"Swipe {gesture.direction} in {gesture.zone} ({gesture.distance}px, {gesture.velocity:.0f}px/s)")
+            self.execute_script(script, f"{zone_title} Swipe {gesture.direction.title()}")
+
+    def schedule_input(self, delay, function, *args):
+        """Run function(*args) on the input dispatcher after delay seconds"""
+        return self.timers.schedule(delay, self.dispatcher.submit, function, *args)
+
+    def execute_script(self, script_path, action_description=None, args=(), env=None):
+        """Execute a script file if it exists, or create it with template.
+
+        An action with a .page file instead (e.g. button-8.page containing
+        "next") switches pages rather than running anything. args are passed
+        to the script and env is added to its environment.
+        """
+        page_link = script_path.with_suffix('.page')
+        if page_link.exists():
+            try:
+                self.switch_page(page_link.read_text())
+            except Exception as e:
+                logging.error(f"Error switching page from {page_link}: {e}")
+            return
 
-    def execute_script(self, script_path, action_description=None):
-        """Execute a script file if it exists, or create it with template"""
         logging.info(f"ACTION: {script_path.name}")
 
         if not script_path.exists():
@@ -982,9 +3631,10 @@ class StreamDeckDaemon:
 
         try:
             subprocess.Popen(
-                [str(script_path)],
+                [str(script_path), *args],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
+                env=dict(os.environ, **env) if env else None,
                 start_new_session=True
             )
         except Exception as e:
@@ -1018,238 +3668,308 @@ notify-send "Stream Deck" "{action_description}" -t 2000
             return (zone_width, ts['height'])
         return (200, 100)
     
-    def load_image_for_touch_zone(self, zone_name):
-        """Load image for touchscreen zone"""
+    def is_watched_file(self, path):
+        """Whether a change to path matters to the daemon"""
+        if path.parent == self.config_dir:
+            return path in (self.brightness_file, self.widgets_file, self.page_file, self.app_pages_file) or path in self.profile_files
+        if path.parent == self.pages_dir:
+            return True  # a page directory was added or removed
+        return path.suffix.lower() in WATCHED_EXTENSIONS
+
+    def start_watcher(self):
+        """Watch the action directories with inotify, or fall back to directory polling"""
+        directories = [self.config_dir, self.buttons_dir, self.touch_dir, self.dials_dir, self.pages_dir]
+        directories += [self.page_dir(page) for page in self.pages if page != 'main']
+        try:
+            self.watcher = InotifyWatcher(directories, accept=self.is_watched_file)
+            logging.info("Watching for file changes with inotify")
+        except (OSError, AttributeError) as e:
+            logging.info(f"inotify unavailable ({e}), polling for file changes")
+            self.watcher = PollingWatcher(
+                directories, accept=self.is_watched_file, interval=self.reload_check_interval)
+
+    def check_for_file_changes(self, timeout=0):
+        """Wait up to timeout seconds for watched files to change.
+
+        Returns the set of changed paths (empty if none), or None if the
+        watcher lost events and everything should be reloaded.
+        """
+        if self.watcher is None:
+            self.start_watcher()
+
+        changed = self.watcher.get_changes(timeout)
+        if changed:
+            logging.info(f"🔄 Files changed: {', '.join(sorted(p.name for p in changed))}")
+        elif changed is None:
+            logging.warning("🔄 File change events lost, reloading everything")
+        return changed
+
+    def targets_for_changes(self, changed_paths):
+        """Map changed files to the (page, button_num) pairs and touch zone names they affect"""
+        buttons = set()
+        zones = set()
+
+        targets = set()
+        if any(p in changed_paths for p in self.profile_files):
+            targets |= self.load_profile()
+
+        for path in changed_paths:
+            path = Path(path)
+            targets |= self.profile_icons.get(path, set())
+            if path.parent == self.buttons_dir and path.suffix != '.sh':
+                match = BUTTON_FILE_RE.match(path.name)
+                if match:
+                    buttons.add(('main', int(match.group(1))))
+            elif path.parent.parent == self.pages_dir and path.suffix != '.sh':
+                match = BUTTON_FILE_RE.match(path.name)
+                if match and path.parent.name in self.pages:
+                    buttons.add((path.parent.name, int(match.group(1))))
+            elif path.parent == self.touch_dir:
+                match = TOUCH_FILE_RE.match(path.name)
+                if match:
+                    zones.add(match.group(1))
+
+        for target in targets:
+            if target.startswith('button-'):
+                buttons.add(('main', int(target.split('-')[1])))
+            else:
+                zones.add(target)
+
+        return buttons, zones
+
+    def reload_displays(self, changed_paths=None):
+        """Reload button and touchscreen displays.
+
+        With changed_paths, only the keys and touch zones those files belong to
+        are re-rendered and re-sent; otherwise everything is repainted.
+        """
+        if changed_paths is None:
+            logging.info("♻️  Reloading displays with updated images and labels...")
+            self.load_pages()
+            self.build_render_config()
+            self.invalidate_pages()
+            self.update_all_displays()
+            self.prefetch_neighbor_pages()
+            logging.info("✓ Displays reloaded!")
+            return
+
+        if any(Path(p).parent == self.pages_dir for p in changed_paths) and self.load_pages():
+            with self.page_switch_lock:
+                if self.current_page not in self.pages:
+                    self.current_page = 'main'
+                    self.update_buttons()
+            self.prefetch_neighbor_pages()
+            self.prefetch_app_pages()
+
+        buttons, zones = self.targets_for_changes(changed_paths)
+        self.build_render_config(buttons, zones)
+
+        # Pages not on screen are re-rendered in the background
+        other_pages = {page for page, _ in buttons if page != self.current_page}
+        if other_pages:
+            self.invalidate_pages(other_pages)
+            self.prefetch_neighbor_pages()
+
+        buttons = {n for page, n in buttons if page == self.current_page}
+        if buttons:
+            logging.info(f"♻️  Redrawing buttons: {', '.join(str(b) for b in sorted(buttons))}")
+            self.update_buttons(buttons)
+        if zones:
+            logging.info(f"♻️  Redrawing touch zones: {', '.join(sorted(zones))}")
+            self.update_touchscreen(zones)
+
+    def render_touch_zone(self, index):
+        """Render a single touchscreen zone, including its divider edges"""
+        zone = self.touch_zones[index]
+        zone_name = zone['name']
+        ts_height = self.device_profile['touchscreen']['height']
         zone_w, zone_h = self.get_touch_zone_size()
-        
-        svg_path = TOUCH_DIR / f"{zone_name}.svg"
-        if svg_path.exists():
-            img = load_svg_image(svg_path, zone_w, zone_h)
-            if img:
-                return img
-        
-        for ext in ['.png', '.jpg', '.jpeg']:
-            img_path = TOUCH_DIR / f"{zone_name}{ext}"
-            if img_path.exists():
-                try:
-                    img = Image.open(img_path)
-                    img = img.convert('RGB')
-                    img = resize_with_aspect_ratio(img, zone_w, zone_h)
-                    return img
-                except Exception as e:
-                    logging.error(f"Error loading {img_path}: {e}")
-        return None
 
-    def load_label_for_touch_zone(self, zone_name):
-        """Load text label for touchscreen zone"""
-        label_path = TOUCH_DIR / f"{zone_name}.txt"
-        if label_path.exists():
-            try:
-                with open(label_path, 'r') as f:
-                    return f.read().strip()
-            except Exception as e:
-                logging.error(f"Error loading {label_path}: {e}")
-        return None
+        widget = self.widgets.get(zone_name)
+        if widget and widget.image is not None:
+            return widget.image.copy()
 
-    def load_text_position_for_touch_zone(self, zone_name):
-        """Load text position preference for touchscreen zone (top, middle, bottom)"""
-        position_path = TOUCH_DIR / f"{zone_name}-position.txt"
-        if position_path.exists():
-            try:
-                with open(position_path, 'r') as f:
-                    position = f.read().strip().lower()
-                    if position in ['top', 'middle', 'bottom']:
-                        return position
-            except Exception as e:
-                logging.error(f"Error loading {position_path}: {e}")
-        return 'middle'  # Default to middle for touchscreen
+        animation = self.load_animation_for_touch_zone(index)
+        if animation:
+            self.animator.play(('zone', zone_name), animation)
+            return animation.first_image.copy()
+        self.animator.stop(('zone', zone_name))
 
-    def load_font_size_for_touch_zone(self, zone_name):
-        """Load font size for touchscreen zone text"""
-        fontsize_path = TOUCH_DIR / f"{zone_name}-fontsize.txt"
-        if fontsize_path.exists():
-            try:
-                with open(fontsize_path, 'r') as f:
-                    fontsize = int(f.read().strip())
-                    if 10 <= fontsize <= 60:
-                        return fontsize
-            except Exception as e:
-                logging.error(f"Error loading {fontsize_path}: {e}")
-        return 28  # Default font size for touchscreen
+        config = self.touch_zone_config(zone_name)
+        img = self.load_config_image(config, zone_w, zone_h)
+        if img is None:
+            img = Image.new('RGB', (zone_w, ts_height), color='#0a0a0a')
+            draw = ImageDraw.Draw(img)
+
+            if config.has_script:
+                color = '#1a3a2a'
+                text_color = '#00ff88'
+            else:
+                color = '#1a1a1a'
+                text_color = '#666666'
+            color = config.background or color
+            text_color = config.color or text_color
+
+            draw.rectangle([(0, 0), (zone_w, ts_height)], fill=color)
+
+            label = config.label
+            position = config.position
+            center_x = zone_w // 2
+            center_y = ts_height // 2
+
+            if label:
+                fontsize = config.fontsize
+                font = get_font(FONT_BOLD, fontsize)
+
+                layout = layout_text(label, FONT_BOLD, fontsize, zone_w - 5)
+                lines = layout.lines
+                line_height = layout.line_height
+
+                if position == 'top':
+                    y_offset = 5
+                    for line in lines[:2]:
+                        draw.text((center_x, y_offset), line, fill=text_color, font=font, anchor="mt")
+                        y_offset += line_height
+                elif position == 'bottom':
+                    y_offset = ts_height - 5 - (len(lines[:2]) - 1) * line_height
+                    for line in lines[:2]:
+                        draw.text((center_x, y_offset), line, fill=text_color, font=font, anchor="mb")
+                        y_offset += line_height
+                else:
+                    total_height = len(lines[:2]) * line_height
+                    y_offset = center_y - (total_height // 2)
+                    for line in lines[:2]:
+                        draw.text((center_x, y_offset), line, fill=text_color, font=font, anchor="mt")
+                        y_offset += line_height
+            else:
+                font = get_font(FONT_REGULAR, 14)
 
-    def check_for_file_changes(self):
-        """Check if any image or label files have been added or modified"""
-        current_time = time.time()
+                draw.text((center_x, center_y), f"Zone {index+1}", fill=text_color, font=font, anchor="mm")
+        else:
+            img = img.copy()
 
-        if current_time - self.last_reload_check < self.reload_check_interval:
-            return False
+        return self.draw_zone_dividers(img, index)
 
-        self.last_reload_check = current_time
+    def draw_zone_dividers(self, img, index):
+        """Zone dividers, drawn in zone coordinates so each zone can be redrawn alone"""
+        zone_w = img.width
+        ts_height = img.height
+        draw = ImageDraw.Draw(img)
+        if index > 0:
+            draw.line([(0, 0), (0, ts_height)], fill='#000000', width=4)
+        draw.line([(zone_w, 0), (zone_w, ts_height)], fill='#000000', width=4)
+        return img
 
-        files_to_check = []
+    def load_animation_for_touch_zone(self, index):
+        """Animation for a touch zone from touch-N.gif or an animated touch-N.png"""
+        zone_name = self.touch_zones[index]['name']
+        zone_w, zone_h = self.get_touch_zone_size()
+        image_format = dict(self.get_touchscreen_image_format(), size=(zone_w, zone_h))
+        for path in animation_candidates(self.touch_zone_config(zone_name).images):
+            animation = self.load_animation(
+                path, (zone_w, zone_h), image_format,
+                decorate=lambda img: self.draw_zone_dividers(img, index), target='touchscreen',
+                decoration=(index > 0,))
+            if animation:
+                return animation
+        return None
 
-        button_count = self.device_profile['buttons'] if self.device_profile else 8
-        for i in range(1, button_count + 1):
-            for ext in ['.png', '.jpg', '.jpeg', '.svg', '.txt']:
-                files_to_check.append(BUTTONS_DIR / f"button-{i}{ext}")
-            files_to_check.append(BUTTONS_DIR / f"button-{i}-position.txt")
-            files_to_check.append(BUTTONS_DIR / f"button-{i}-fontsize.txt")
+    def submit_touch_zone_renders(self, zone_names=None):
+        """Queue renders for the given touch zones (all if None) on the render pool.
 
-        if self.device_profile and self.device_profile.get('touchscreen'):
-            zone_count = self.device_profile['touchscreen'].get('zones', 4)
-            for i in range(1, zone_count + 1):
-                for ext in ['.png', '.jpg', '.jpeg', '.svg', '.txt']:
-                    files_to_check.append(TOUCH_DIR / f"touch-{i}{ext}")
-                files_to_check.append(TOUCH_DIR / f"touch-{i}-position.txt")
-                files_to_check.append(TOUCH_DIR / f"touch-{i}-fontsize.txt")
-
-        changed = False
-        for file_path in files_to_check:
-            if file_path.exists():
-                try:
-                    mtime = file_path.stat().st_mtime
-                    if str(file_path) not in self.file_mtimes:
-                        logging.info(f"🔄 New file detected: {file_path.name}")
-                        self.file_mtimes[str(file_path)] = mtime
-                        changed = True
-                    elif self.file_mtimes[str(file_path)] != mtime:
-                        logging.info(f"🔄 File modified: {file_path.name}")
-                        self.file_mtimes[str(file_path)] = mtime
-                        changed = True
-                except Exception as e:
-                    logging.debug(f"Error checking {file_path}: {e}")
-            else:
-                if str(file_path) in self.file_mtimes:
-                    logging.info(f"🔄 File deleted: {file_path.name}")
-                    del self.file_mtimes[str(file_path)]
-                    changed = True
+        Returns a list of (zone_name, future) pairs for update_touchscreen().
+        """
+        if not self.device_profile or not self.device_profile.get('touchscreen'):
+            return []
 
-        return changed
+        pool = self.get_render_pool()
+        return [
+            (zone['name'], pool.submit(self.render_touch_zone, i))
+            for i, zone in enumerate(self.touch_zones)
+            if zone_names is None or zone['name'] in zone_names or zone['name'] not in self.touch_zone_images
+        ]
 
-    def reload_displays(self):
-        """Reload all button and touchscreen displays"""
-        logging.info("♻️  Reloading displays with updated images and labels...")
-        self.update_all_buttons()
-        self.update_touchscreen()
-        logging.info("✓ Displays reloaded!")
+    def update_touchscreen(self, zone_names=None, pending=None):
+        """Update the touchscreen LCD with custom images and labels.
 
-    def update_touchscreen(self):
-        """Update the touchscreen LCD with custom images and labels"""
-        if not self.deck or not hasattr(self.deck, 'set_touchscreen_image'):
-            return
+        Only zones in zone_names are re-rendered and, once the full strip has
+        been painted, only their rectangles are encoded and sent. With no
+        zone_names every zone is re-rendered and the whole strip is sent.
+        pending takes renders already queued by submit_touch_zone_renders().
+        Returns the perf_counter() time the last frame was queued.
+        """
+        if not self.deck or not self.writer:
+            return None
         
         if not self.device_profile or not self.device_profile.get('touchscreen'):
-            return
+            return None
         
         ts = self.device_profile['touchscreen']
         ts_width = ts['width']
         ts_height = ts['height']
-        zone_w, zone_h = self.get_touch_zone_size()
-
-        img = Image.new('RGB', (ts_width, ts_height), color='#0a0a0a')
-
-        for i, zone in enumerate(self.touch_zones):
-            x = zone['x']
-            zone_name = zone['name']
-
-            zone_img = self.load_image_for_touch_zone(zone_name)
-            if zone_img:
-                img.paste(zone_img, (x, 0))
-            else:
-                draw = ImageDraw.Draw(img)
-
-                script = TOUCH_DIR / f"{zone_name}.sh"
-                if script.exists():
-                    color = '#1a3a2a'
-                    text_color = '#00ff88'
-                else:
-                    color = '#1a1a1a'
-                    text_color = '#666666'
-
-                draw.rectangle([(x, 0), (x + zone_w, ts_height)], fill=color)
-
-                label = self.load_label_for_touch_zone(zone_name)
-                position = self.load_text_position_for_touch_zone(zone_name)
-                center_x = x + zone_w // 2
-                center_y = ts_height // 2
-
-                if label:
-                    fontsize = self.load_font_size_for_touch_zone(zone_name)
-                    try:
-                        font = ImageFont.truetype(
-                            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", fontsize)
-                    except:
-                        font = ImageFont.load_default()
-
-                    lines = self.wrap_text(label, font, zone_w - 5)
-                    line_height = fontsize + 5
-
-                    if position == 'top':
-                        y_offset = 5
-                        for line in lines[:2]:
-                            draw.text((center_x, y_offset), line, fill=text_color, font=font, anchor="mt")
-                            y_offset += line_height
-                    elif position == 'bottom':
-                        y_offset = ts_height - 5 - (len(lines[:2]) - 1) * line_height
-                        for line in lines[:2]:
-                            draw.text((center_x, y_offset), line, fill=text_color, font=font, anchor="mb")
-                            y_offset += line_height
-                    else:
-                        total_height = len(lines[:2]) * line_height
-                        y_offset = center_y - (total_height // 2)
-                        for line in lines[:2]:
-                            draw.text((center_x, y_offset), line, fill=text_color, font=font, anchor="mt")
-                            y_offset += line_height
-                else:
-                    try:
-                        font = ImageFont.truetype(
-                            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 14)
-                    except:
-                        font = ImageFont.load_default()
-
-                    draw.text((center_x, center_y), f"Zone {i+1}", fill=text_color, font=font, anchor="mm")
-
-        draw = ImageDraw.Draw(img)
-        for i, zone in enumerate(self.touch_zones):
-            x = zone['x']
 
-            if i > 0:
-                draw.line([(x, 0), (x, ts_height)], fill='#000000', width=4)
+        if pending is None:
+            pending = self.submit_touch_zone_renders(zone_names)
+        rendered = set()
+        for zone_name, future in pending:
+            self.touch_zone_images[zone_name] = future.result()
+            rendered.add(zone_name)
 
-            if i == len(self.touch_zones) - 1:
-                draw.line([(x + zone_w, 0), (x + zone_w, ts_height)], fill='#000000', width=4)
+        full_rect = (0, 0, ts_width, ts_height)
 
         try:
-            buf = BytesIO()
-            img.save(buf, format='JPEG', quality=95)
-            self.deck.set_touchscreen_image(buf.getvalue(), 0, 0, ts_width, ts_height)
+            # Once the whole strip has been painted, send only the zones that changed
+            if zone_names is not None and full_rect in self.touchscreen_frames:
+                for zone in self.touch_zones:
+                    if zone['name'] not in rendered:
+                        continue
+                    rect = (zone['x'], 0, zone['width'], ts_height)
+                    frame = self.encode_touchscreen_frame(self.touch_zone_images[zone['name']])
+                    self.writer.submit(('rect', rect), frame)
+                    # Re-insert so resend_frames() replays regions in the order they were sent
+                    self.touchscreen_frames.pop(rect, None)
+                    self.touchscreen_frames[rect] = frame
+                return time.perf_counter()
+
+            img = Image.new('RGB', (ts_width, ts_height), color='#0a0a0a')
+            for zone in self.touch_zones:
+                img.paste(self.touch_zone_images[zone['name']], (zone['x'], 0))
+
+            frame = self.encode_touchscreen_frame(img)
+            self.writer.submit(('rect', full_rect), frame)
+            self.touchscreen_frames = {full_rect: frame}
+            return time.perf_counter()
         except Exception as e:
             logging.error(f"Error updating touchscreen: {e}")
-            # Mark device as disconnected on communication error
-            if self.device_connected and ("hid" in str(e).lower() or "device" in str(e).lower() or "usb" in str(e).lower()):
-                logging.warning("USB communication error detected - device may be disconnected")
-                self.device_connected = False
+            return None
 
     def run(self):
         """Main run loop"""
+        self.load_profile()
         if not self.connect_device():
             return 1
 
         self.running = True
+        self.load_pages()
+        self.start_watcher()
+        self.start_hotplug_monitor()
+        self.load_widgets()
+        self.start_widgets()
+        self.start_frame_server()
 
         # Update all displays
-        logging.info("Updating button displays...")
-        self.update_all_buttons()
-
-        logging.info("Updating touchscreen display...")
-        self.update_touchscreen()
+        logging.info("Updating button and touchscreen displays...")
+        self.update_all_displays()
+        self.prefetch_neighbor_pages()
+        self.load_app_pages()
+        self.start_window_source()
 
         logging.info("")
         logging.info("="*60)
         logging.info(f"Stream Deck Daemon Running - {self.device_type or 'Unknown Device'}")
         logging.info("="*60)
         logging.info("")
-        logging.info(f"Actions directory: {ACTIONS_DIR}")
+        logging.info(f"Actions directory: {self.config_dir}")
         logging.info("")
         logging.info("Supported gestures for this device:")
         
@@ -1289,8 +4009,22 @@ notify-send "Stream Deck" "{action_description}" -t 2000
             while self.running:
                 current_time = time.time()
 
+                if self.hotplug and self.hotplug_action:
+                    self.handle_hotplug()
+
+                if self.hotplug and self.hotplug.alive:
+                    if self.device_removed:
+                        # Unplugged: wait for the next hotplug event, enumerating
+                        # on each quiet wake in case an add was missed
+                        if not self.hotplug_wakeup.wait(5.0) and self.check_device_presence():
+                            logging.info("✓ Device detected - attempting reconnection...")
+                            self.device_removed = False
+                            self.reconnect.kick()
+                        self.hotplug_wakeup.clear()
+                        continue
+
                 # Periodically check if device is still physically present
-                if current_time - self.last_device_check >= self.device_check_interval:
+                elif current_time - self.last_device_check >= self.device_check_interval:
                     self.last_device_check = current_time
 
                     # Check if device is present via USB enumeration
@@ -1299,19 +4033,13 @@ notify-send "Stream Deck" "{action_description}" -t 2000
                     # If we think we're connected but device is not present, mark as disconnected
                     if self.device_connected and not device_present:
                         logging.warning("⚠ Device unplugged - detected via USB enumeration")
-                        self.device_connected = False
-                        if self.deck:
-                            try:
-                                self.deck.close()
-                            except Exception:
-                                pass
-                            self.deck = None
-
-                    # If we think we're disconnected but device is present, try to reconnect
-                    if not self.device_connected and device_present:
+                        self.release_device()
+
+                    # A device appeared while we are disconnected: retry right away
+                    if not self.device_connected and device_present and not self.device_present:
                         logging.info("✓ Device detected - attempting reconnection...")
-                        if self.attempt_reconnect():
-                            logging.info("✓ Successfully reconnected after replug!")
+                        self.reconnect.kick()
+                    self.device_present = device_present
 
                 # Check if device is still connected
                 if not self.device_connected:
@@ -1319,28 +4047,71 @@ notify-send "Stream Deck" "{action_description}" -t 2000
                     if self.attempt_reconnect():
                         logging.info("✓ Device reconnected successfully!")
                     else:
-                        # Wait before next iteration if reconnection failed
-                        time.sleep(1.0)
+                        # Sleep until the next attempt is due, or a hotplug event
+                        wait = self.reconnect.wait_time()
+                        if not (self.hotplug and self.hotplug.alive):
+                            wait = min(wait, max(0.0, self.last_device_check + self.device_check_interval - time.time()))
+                        self.hotplug_wakeup.wait(wait)
+                        self.hotplug_wakeup.clear()
                         continue
 
-                # Check for file changes and reload displays if needed
+                # Wait for file changes (this is also the loop's idle sleep)
                 try:
-                    if self.check_for_file_changes():
-                        self.reload_displays()
+                    changed_paths = self.check_for_file_changes(timeout=0.5)
                 except Exception as e:
                     logging.error(f"Error checking file changes: {e}")
                     # Don't mark as disconnected for file system errors
+                    changed_paths = set()
+                    time.sleep(0.5)
+
+                if changed_paths is None:
+                    changed_paths = {self.brightness_file, self.widgets_file}
+                    self.load_profile()
+                    self.reload_displays()
 
                 # Check for brightness changes
-                try:
-                    self.check_brightness_change()
-                except Exception as e:
-                    logging.error(f"Error checking brightness: {e}")
+                if self.brightness_file in changed_paths:
+                    try:
+                        self.check_brightness_change()
+                    except Exception as e:
+                        logging.error(f"Error checking brightness: {e}")
+
+                # Page switch requested by a script (echo next > .page)
+                if self.page_file in changed_paths and self.page_file.exists():
+                    try:
+                        self.dispatcher.submit(self.switch_page, self.page_file.read_text())
+                    except Exception as e:
+                        logging.error(f"Error reading {self.page_file}: {e}")
 
-                time.sleep(0.5)
+                if self.app_pages_file in changed_paths:
+                    self.load_app_pages()
+
+                # Pick up edits to widgets.json, otherwise redraw what changed
+                if self.widgets_file in changed_paths and self.load_widgets():
+                    self.reload_displays()
+                elif changed_paths:
+                    self.reload_displays(changed_paths)
         except KeyboardInterrupt:
             logging.info("\nShutting down...")
         finally:
+            self.running = False
+            self.widget_wakeup.set()
+            self.stop_frame_server()
+            if self.window_source:
+                self.window_source.stop()
+            if self.hotplug:
+                self.hotplug.close()
+            if self.watcher:
+                self.watcher.close()
+            self.animator.shutdown()
+            self.timers.shutdown()
+            logging.info(f"Input dispatch: {self.dispatcher.stats()}")
+            self.dispatcher.close()
+            if self.render_pool:
+                self.render_pool.shutdown(wait=False, cancel_futures=True)
+            if self.widget_pool:
+                self.widget_pool.shutdown(wait=False, cancel_futures=True)
+            self.close_writer()
             if self.deck:
                 try:
                     self.deck.reset()
@@ -1351,14 +4122,200 @@ notify-send "Stream Deck" "{action_description}" -t 2000
         return 0
 
 
-def main():
+def calibrate_encoders(min_psnr=40.0):
+    """Benchmark JPEG settings for every model in DEVICE_PROFILES and write the
+    chosen ones to ENCODER_PROFILES_FILE"""
+    profiles = {}
+    for model in DEVICE_PROFILES:
+        deck = VirtualDeck(model)
+        targets = {}
+        if deck.is_visual():
+            targets['key'] = deck.key_image_format()
+        if deck.is_touch() and deck.touchscreen_image_format()['format']:
+            targets['touchscreen'] = deck.touchscreen_image_format()
+
+        profiles[model] = {}
+        for target, image_format in targets.items():
+            if image_format['format'] != 'JPEG':
+                profiles[model][target] = {"format": image_format['format']}
+                print(f"{model} {target}: {image_format['format']}, nothing to tune")
+                continue
+
+            # Pillow's JPEG default subsampling (None) is 4:2:0
+            default = DEFAULT_ENCODER_SETTINGS[target]
+            default = (default['quality'], 2 if default['subsampling'] is None else default['subsampling'])
+            chosen, baseline, results = calibrate_encoder(image_format, min_psnr=min_psnr, default=default)
+            print(f"{model} {target} {tuple(image_format['size'])}:")
+            for r in results:
+                mark = "*" if r is chosen else " "
+                print(f"  {mark} q{r['quality']:3d} sub{r['subsampling']}  {r['bytes']:6d} B  "
+                      f"{r['encode_ms']:7.3f} ms  {r['psnr']:6.2f} dB")
+            print(f"  -> quality {chosen['quality']}, subsampling {chosen['subsampling']}: "
+                  f"{chosen['bytes']} B vs {baseline['bytes']} B at the default quality {baseline['quality']}")
+            profiles[model][target] = dict(chosen, format='JPEG')
+
+    ENCODER_PROFILES_FILE.write_text(json.dumps(profiles, indent=2) + "\n")
+    print(f"Wrote {ENCODER_PROFILES_FILE}")
+    return 0
+
+
+def read_deck_serials(device_manager=None, skip_ids=()):
+    """Serial numbers of the attached decks, skipping the device ids in skip_ids
+    (decks an instance has open)"""
+    serials = []
+    with StreamDeckDaemon.claim_lock:
+        for deck in (device_manager or DeviceManager()).enumerate():
+            if deck.id() in skip_ids:
+                continue
+            try:
+                deck.open()
+                try:
+                    serials.append(deck.get_serial_number())
+                finally:
+                    deck.close()
+            except Exception as e:
+                logging.warning(f"Could not read serial number of {deck.id()}: {e}")
+    return serials
+
+
+def deck_config_dir(serial, top_level_free):
+    """Where a deck's actions live: decks/<serial>/ if it exists, else the
+    top-level directories if no other deck uses them, else a fresh
+    decks/<serial>/"""
+    config_dir = DECKS_DIR / serial
+    if not config_dir.is_dir() and top_level_free:
+        return ACTIONS_DIR
+    for directory in (BUTTONS_DIR, PAGES_DIR, DIALS_DIR, TOUCH_DIR):
+        (config_dir / directory.name).mkdir(parents=True, exist_ok=True)
+    return config_dir
+
+
+def deck_config_dirs(device_manager=None):
+    """(serial, config dir) for each attached deck.
+
+    A deck with a decks/<serial>/ directory uses it; the first deck without
+    one keeps the top-level directories, so a single deck needs no setup.
+    Any other deck gets a fresh decks/<serial>/. A single deck on the top
+    level is not pinned to its serial (None), so a replacement deck is
+    picked up as before.
+    """
+    serials = read_deck_serials(device_manager)
+    decks = []
+    for serial in serials:
+        top_level_free = all(config_dir != ACTIONS_DIR for _, config_dir in decks)
+        config_dir = deck_config_dir(serial, top_level_free)
+        pinned = len(serials) > 1 or config_dir != ACTIONS_DIR
+        decks.append((serial if pinned else None, config_dir))
+    return decks
+
+
+class DeckSupervisor:
+    """Runs one StreamDeckDaemon per deck, sharing the frame caches so decks of
+    the same model showing the same keys render and encode each frame once.
+
+    A deck plugged in later that no instance drives or is waiting for gets
+    an instance of its own; hotplug events trigger the check, which also
+    runs every scan_interval seconds.
+    """
+
+    def __init__(self, device_manager=None, scan_interval=5.0):
+        self.device_manager = device_manager
+        self.scan_interval = scan_interval
+        self.frame_cache = FrameCache(disk_dir=CACHE_DIR / "frames")
+        self.svg_cache = FrameCache(max_entries=512, disk_dir=CACHE_DIR / "svg")
+        self.daemons = []  # (daemon, thread)
+        self.wakeup = threading.Event()
+        self.hotplug = None
+
+    def start(self, serial, config_dir):
+        daemon = StreamDeckDaemon(serial, config_dir, self.frame_cache, self.svg_cache, self.device_manager)
+        thread = threading.Thread(target=daemon.run, name=f"deck-{serial}")
+        self.daemons.append((daemon, thread))
+        thread.start()
+
+    def running(self):
+        return [daemon for daemon, thread in self.daemons if thread.is_alive()]
+
+    def on_hotplug(self, action):
+        if action in ('add', 'overflow'):
+            self.wakeup.set()
+
+    def scan(self):
+        """Start an instance for each attached deck that no instance drives or waits for"""
+        daemons = self.running()
+        taken = {daemon.deck_id for daemon in daemons if daemon.deck is not None}
+        for serial in read_deck_serials(self.device_manager, taken):
+            if any(serial in (daemon.serial, daemon.deck_serial) for daemon in daemons):
+                continue  # its instance reconnects by itself
+            if any(daemon.serial is None and not daemon.device_connected for daemon in daemons):
+                continue  # an unpinned instance waiting for any deck takes it
+            top_level_free = all(daemon.config_dir != ACTIONS_DIR for daemon in daemons)
+            config_dir = deck_config_dir(serial, top_level_free)
+            logging.info(f"New Stream Deck {serial}: driving it with {config_dir}")
+            self.start(serial, config_dir)
+            daemons = self.running()
+
+    def stop(self):
+        for daemon, thread in self.daemons:
+            daemon.running = False
+            daemon.hotplug_wakeup.set()
+            if daemon.watcher:
+                daemon.watcher.wake()
+        for daemon, thread in self.daemons:
+            thread.join()
+
+    def run(self, decks):
+        for serial, config_dir in decks:
+            self.start(serial, config_dir)
+
+        if self.device_manager is None:
+            try:
+                self.hotplug = HotplugMonitor(self.on_hotplug)
+            except (OSError, AttributeError):
+                pass
+
+        try:
+            while self.running():
+                if self.wakeup.wait(self.scan_interval):
+                    self.wakeup.clear()
+                    time.sleep(1.0)  # let instances waiting for a deck reconnect first
+                self.scan()
+        except KeyboardInterrupt:
+            logging.info("Shutting down...")
+            self.stop()
+        finally:
+            if self.hotplug:
+                self.hotplug.close()
+        return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream Deck daemon")
+    parser.add_argument("--virtual", action="append", metavar="MODEL", choices=sorted(DEVICE_PROFILES),
+                        help="drive a software deck of this model instead of USB devices (repeatable)")
+    parser.add_argument("--calibrate-encoder", action="store_true",
+                        help=f"benchmark JPEG settings for each model, write {ENCODER_PROFILES_FILE.name} and exit")
+    parser.add_argument("--min-psnr", type=float, default=40.0,
+                        help="fidelity the calibrated settings must keep, in dB (default: 40)")
+    args = parser.parse_args(argv)
+    setup_logging()
+    if args.calibrate_encoder:
+        return calibrate_encoders(args.min_psnr)
+    device_manager = VirtualDeviceManager(args.virtual) if args.virtual else None
+
     # Ensure directories exist
     BUTTONS_DIR.mkdir(parents=True, exist_ok=True)
+    PAGES_DIR.mkdir(parents=True, exist_ok=True)
     DIALS_DIR.mkdir(parents=True, exist_ok=True)
     TOUCH_DIR.mkdir(parents=True, exist_ok=True)
 
-    daemon = StreamDeckDaemon()
-    return daemon.run()
+    decks = deck_config_dirs(device_manager)
+    if not decks:
+        # Nothing attached: report it and exit, as a single instance does
+        daemon = StreamDeckDaemon(device_manager=device_manager)
+        return daemon.run()
+
+    return DeckSupervisor(device_manager).run(decks)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,237 @@
+"""
+Stream Deck Touchscreen Gesture Recognizer
+Turns the StreamDeck library's touchscreen events (SHORT, LONG and DRAG
+packets) into taps, long presses, swipes within a zone and long swipes
+from the edges of the strip.
+
+Decisions are committed as soon as they are unambiguous: a drag whose
+direction is clear and that is long or fast enough is a swipe on the packet
+that makes it so, without waiting for the finger to settle. Only drags that
+stay short and slow wait for the settle timeout.
+
+Used by streamdeck-daemon.py, one recognizer per deck:
+  recognizer = GestureRecognizer(zones, 800, 100, schedule, on_gesture)
+  recognizer.drag(x, y, x_out, y_out)   # on DRAG
+  recognizer.tap(x)                     # on SHORT
+  recognizer.long_press(x)              # on LONG
+"""
+
+import time
+from collections import namedtuple
+
+# kind: 'tap', 'longpress', 'swipe' or 'longswipe'; zone: the zone's name
+# (None for long swipes); direction: 'left'/'right'/'up'/'down' for swipes;
+# distance in pixels and velocity in pixels per second along the swipe
+Gesture = namedtuple('Gesture', ['kind', 'zone', 'direction', 'distance', 'velocity'])
+
+
+class Touch:
+    """One finger down on the strip, as seen through DRAG packets"""
+
+    __slots__ = ('start_x', 'start_y', 'end_x', 'end_y', 'zone', 'last_time',
+                 'velocity_x', 'velocity_y', 'moved', 'decided', 'long_pressed',
+                 'long_press_timer', 'settle_timer')
+
+    def __init__(self, x, y, zone, now):
+        self.start_x = self.end_x = x
+        self.start_y = self.end_y = y
+        self.zone = zone
+        self.last_time = now
+        self.velocity_x = self.velocity_y = 0.0
+        self.moved = False
+        self.decided = False
+        self.long_pressed = False  # decided as a long press: the lift does nothing more
+        self.long_press_timer = None
+        self.settle_timer = None
+
+    def cancel_timers(self):
+        for timer in (self.long_press_timer, self.settle_timer):
+            if timer:
+                timer.cancel()
+        self.long_press_timer = self.settle_timer = None
+
+
+class GestureRecognizer:
+    """Gesture decisions for one touchscreen.
+
+    zones are the daemon's touch zones ({"name", "x", "width"} dicts); the
+    x -> zone lookup table is built from them once. Thresholds scale with
+    the strip, so a 248x58 Neo info strip needs proportionally shorter
+    swipes than the 800x100 strip of the Stream Deck +:
+
+    swipe_distance      shortest swipe: 30% of the smaller zone side
+    commit_distance_x/_y  a swipe this long is committed at once: half a
+                        zone (horizontal) or half the strip height (vertical)
+    flick_velocity      a swipe this fast is committed at swipe_distance:
+                        the strip's width per second
+    edge_width          long swipes start within this of an edge: 10% of the width
+    longswipe_distance  and travel at least a quarter zone inwards
+
+    schedule(delay, function, *args) runs function later and returns a handle
+    with cancel() (the daemon's timer scheduler); on_gesture(gesture) is
+    called with each decision. All methods must be called from one thread,
+    including the scheduled functions.
+    """
+
+    def __init__(self, zones, width, height, schedule, on_gesture,
+                 long_press_time=0.5, settle_time=0.2, reset_time=1.0):
+        self.width = width
+        self.height = height
+        self.schedule = schedule
+        self.on_gesture = on_gesture
+        self.long_press_time = long_press_time
+        self.settle_time = settle_time
+        self.reset_time = reset_time
+
+        self.zone_lut = [None] * width
+        for zone in zones:
+            for x in range(max(zone['x'], 0), min(zone['x'] + zone['width'], width)):
+                self.zone_lut[x] = zone['name']
+
+        zone_width = width / max(len(zones), 1)
+        self.swipe_distance = max(8, round(min(zone_width, height) * 0.3))
+        self.commit_distance_x = max(self.swipe_distance, round(zone_width / 2))
+        self.commit_distance_y = max(self.swipe_distance, round(height / 2))
+        self.flick_velocity = width
+        self.edge_width = width // 10
+        self.longswipe_distance = max(self.swipe_distance, round(zone_width / 4))
+
+        self.touch = None
+
+    def zone_at(self, x):
+        if not self.zone_lut:
+            return None
+        return self.zone_lut[min(max(int(x), 0), self.width - 1)]
+
+    def drag(self, x, y, x_out=None, y_out=None, now=None):
+        """A DRAG packet: the finger moved from (x, y) to (x_out, y_out)"""
+        now = time.monotonic() if now is None else now
+        x_out = x if x_out is None else x_out
+        y_out = y if y_out is None else y_out
+
+        touch = self.touch
+        if touch is None or not self._continues(touch, x, y, now):
+            if touch:
+                touch.cancel_timers()
+            touch = self.touch = Touch(x, y, self.zone_at(x), now)
+            if touch.zone:
+                touch.long_press_timer = self.schedule(self.long_press_time, self._long_press_elapsed, touch)
+        elif touch.decided:
+            touch.last_time = now  # the rest of a gesture already acted on
+            return
+
+        dt = now - touch.last_time
+        if dt > 0:
+            touch.velocity_x = (x_out - touch.end_x) / dt
+            touch.velocity_y = (y_out - touch.end_y) / dt
+        touch.end_x, touch.end_y = x_out, y_out
+        touch.last_time = now
+
+        dx = touch.end_x - touch.start_x
+        dy = touch.end_y - touch.start_y
+        if max(abs(dx), abs(dy)) >= self.swipe_distance and not touch.moved:
+            touch.moved = True  # no long press once the finger travels
+            if touch.long_press_timer:
+                touch.long_press_timer.cancel()
+                touch.long_press_timer = None
+
+        if self._unambiguous(touch, dx, dy):
+            self._commit(touch, self._classify(touch, dx, dy))
+        else:
+            if touch.settle_timer:
+                touch.settle_timer.cancel()
+            touch.settle_timer = self.schedule(self.settle_time, self._settled, touch)
+
+    def _continues(self, touch, x, y, now):
+        """Whether a DRAG packet from (x, y) belongs to the current touch: it
+        starts where the touch started (cumulative reports) or where the last
+        packet ended (incremental ones), soon enough after it"""
+        idle = now - touch.last_time
+        if idle > (self.settle_time if touch.decided else self.reset_time):
+            return False
+        return (x, y) in ((touch.start_x, touch.start_y), (touch.end_x, touch.end_y))
+
+    def tap(self, x, now=None):
+        """A SHORT event: the finger lifted at x"""
+        now = time.monotonic() if now is None else now
+        touch = self.end_touch(now)
+        if touch and touch.long_pressed:
+            return  # lift after a long press already acted on
+        if touch and touch.decided and now - touch.last_time <= self.settle_time:
+            return  # lift at the end of a swipe already acted on
+        if touch and touch.moved and not touch.decided:
+            self._commit(touch, self._classify(touch, touch.end_x - touch.start_x, touch.end_y - touch.start_y))
+            return
+        zone = self.zone_at(x)
+        if zone:
+            self.on_gesture(Gesture('tap', zone, None, 0, 0.0))
+
+    def long_press(self, x, now=None):
+        """A LONG event from the device"""
+        now = time.monotonic() if now is None else now
+        touch = self.end_touch(now)
+        if touch and (touch.long_pressed or touch.decided and now - touch.last_time <= self.settle_time):
+            return
+        zone = self.zone_at(x)
+        if zone:
+            self.on_gesture(Gesture('longpress', zone, None, 0, 0.0))
+
+    def end_touch(self, now=None):
+        """Forget the current touch and cancel its timers; returns it, or
+        None if it was already over. A touch decided as a long press lasts
+        until the finger lifts, however long it is held."""
+        now = time.monotonic() if now is None else now
+        touch, self.touch = self.touch, None
+        if touch:
+            touch.cancel_timers()
+            if now - touch.last_time > self.reset_time and not touch.long_pressed:
+                return None
+        return touch
+
+    def _unambiguous(self, touch, dx, dy):
+        """Whether the drag so far can only be one swipe"""
+        major, minor = (abs(dx), abs(dy)) if abs(dx) >= abs(dy) else (abs(dy), abs(dx))
+        if major < self.swipe_distance or major < 2 * minor:
+            return False
+        commit_distance = self.commit_distance_x if abs(dx) >= abs(dy) else self.commit_distance_y
+        speed = max(abs(touch.velocity_x), abs(touch.velocity_y))
+        return major >= commit_distance or speed >= self.flick_velocity or self._longswipe(touch, dx)
+
+    def _longswipe(self, touch, dx):
+        if touch.start_x < self.edge_width and dx >= self.longswipe_distance:
+            return 'right'
+        if touch.start_x >= self.width - self.edge_width and dx <= -self.longswipe_distance:
+            return 'left'
+        return None
+
+    def _classify(self, touch, dx, dy):
+        velocity = max(abs(touch.velocity_x), abs(touch.velocity_y))
+        direction = self._longswipe(touch, dx)
+        if direction:
+            return Gesture('longswipe', None, direction, abs(dx), velocity)
+        if abs(dx) > abs(dy):
+            direction = 'right' if dx > 0 else 'left'
+        else:
+            direction = 'down' if dy > 0 else 'up'
+        return Gesture('swipe', touch.zone, direction, max(abs(dx), abs(dy)), velocity)
+
+    def _commit(self, touch, gesture):
+        touch.decided = True
+        touch.long_pressed = gesture.kind == 'longpress'
+        touch.cancel_timers()
+        if gesture.zone or gesture.kind == 'longswipe':
+            self.on_gesture(gesture)
+
+    def _settled(self, touch):
+        """No DRAG packets for settle_time: decide on what the drag did"""
+        if touch is not self.touch or touch.decided:
+            return
+        touch.settle_timer = None
+        if touch.moved:
+            self._commit(touch, self._classify(touch, touch.end_x - touch.start_x, touch.end_y - touch.start_y))
+
+    def _long_press_elapsed(self, touch):
+        if touch is not self.touch or touch.decided or touch.moved:
+            return
+        touch.long_press_timer = None
+        self._commit(touch, Gesture('longpress', touch.zone, None, 0, 0.0))
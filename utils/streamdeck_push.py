@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Stream Deck Frame Push Client
+Sends images straight to the running daemon over its Unix socket, skipping
+the button-N.png file and the daemon's file watcher.
+
+Usage:
+  streamdeck_push.py button-3 image.png
+  streamdeck_push.py touch-4 chart.png
+  streamdeck_push.py touchscreen strip.png --rect 0 0 400 100
+
+From Python:
+  from streamdeck_push import FramePushClient
+  with FramePushClient() as client:
+      client.push_image("touch-4", pil_image)
+"""
+
+import os
+import sys
+import json
+import socket
+import argparse
+from pathlib import Path
+
+FRAME_SOCKET = Path(os.environ.get("XDG_RUNTIME_DIR", "/tmp")) / f"streamdeck-daemon-{os.getuid()}.sock"
+
+
+class FramePushClient:
+    def __init__(self, socket_path=FRAME_SOCKET):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(str(socket_path))
+        self.reader = self.sock.makefile('rb')
+
+    def push(self, target, data, format="image", width=None, height=None, rect=None):
+        """Send one frame.
+
+        target: "button-N", "touch-N" or "touchscreen" (requires rect=(x, y, w, h))
+        format: "image" (PNG/JPEG/... bytes), "rgb" (raw bytes, needs width and
+                height) or "native" (already in the device's native format)
+        """
+        header = {"target": target, "format": format, "length": len(data)}
+        if width is not None:
+            header["width"] = width
+            header["height"] = height
+        if rect is not None:
+            header.update(zip(("x", "y", "width", "height"), rect))
+
+        self.sock.sendall(json.dumps(header).encode('utf-8') + b"\n" + data)
+        reply = json.loads(self.reader.readline())
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "push failed"))
+
+    def push_image(self, target, img, rect=None):
+        """Send a PIL image as raw RGB, skipping a PNG encode here and a decode in the daemon"""
+        img = img.convert('RGB')
+        if rect is not None and tuple(rect[2:]) != img.size:
+            img = img.resize(tuple(rect[2:]))
+        self.push(target, img.tobytes(), format="rgb", width=img.width, height=img.height, rect=rect)
+
+    def _stats_reply(self):
+        self.sock.sendall(json.dumps({"target": "stats", "length": 0}).encode('utf-8') + b"\n")
+        reply = json.loads(self.reader.readline())
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "stats failed"))
+        return reply
+
+    def stats(self):
+        """The daemon's device writer stats (queue depth, coalesced frames, write latency)"""
+        return self._stats_reply()["stats"]
+
+    def input_stats(self):
+        """The daemon's input dispatch stats (events handled, input-to-dispatch latency)"""
+        return self._stats_reply()["input"]
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Push an image to a Stream Deck key or touch zone")
+    parser.add_argument("target", help="button-N, touch-N or touchscreen")
+    parser.add_argument("image", help="image file to send")
+    parser.add_argument("--rect", nargs=4, type=int, metavar=("X", "Y", "W", "H"),
+                        help="touchscreen rectangle (target touchscreen only)")
+    parser.add_argument("--native", action="store_true",
+                        help="file is already in the device's native format")
+    parser.add_argument("--socket", default=str(FRAME_SOCKET), help="daemon socket path")
+    args = parser.parse_args()
+
+    data = Path(args.image).read_bytes()
+    try:
+        with FramePushClient(args.socket) as client:
+            client.push(args.target, data, format="native" if args.native else "image", rect=args.rect)
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Stream Deck Virtual Deck Smoke Test
+Runs the daemon against a virtual deck (no hardware, no USB permissions) in
+a throwaway action directory and checks the paths that matter most:
+
+  render     every key painted, and how long the first full paint took
+  input      key taps reach their scripts through the input dispatcher
+  reconnect  unplug/replug restores the same frames without a reset
+
+Prints one line per check with its timings and exits non-zero if any
+check fails, so it can run in CI.
+
+Usage:
+  virtual-deck-smoke.py
+  virtual-deck-smoke.py --model "Stream Deck XL" --write-delay 0.002 --verbose
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import threading
+import importlib.util
+from pathlib import Path
+
+from PIL import Image
+
+DAEMON = Path(__file__).resolve().parent.parent / "streamdeck-daemon.py"
+
+
+def load_daemon():
+    """Import streamdeck-daemon.py (not a module name) as a module"""
+    sys.path.insert(0, str(DAEMON.parent))  # streamdeck_gestures
+    spec = importlib.util.spec_from_file_location("streamdeck_daemon", DAEMON)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def wait_for(condition, timeout):
+    """Poll condition() until it holds; returns the time it took, or None on timeout"""
+    start = time.perf_counter()
+    while not condition():
+        if time.perf_counter() - start > timeout:
+            return None
+        time.sleep(0.005)
+    return time.perf_counter() - start
+
+
+def make_actions(root, key_count, marker_dir):
+    """Icons and labels for every key, and a script per key that leaves a marker"""
+    for directory in ("buttons", "pages", "dials", "touchscreen"):
+        (root / directory).mkdir(parents=True, exist_ok=True)
+    for n in range(1, key_count + 1):
+        Image.new('RGB', (64, 64), (n * 7 % 256, 80, 160)).save(root / "buttons" / f"button-{n}.png")
+        (root / "buttons" / f"button-{n}.txt").write_text(f"Key {n}")
+        script = root / "buttons" / f"button-{n}.sh"
+        script.write_text(f"#!/bin/sh\ntouch '{marker_dir}/{n}'\n")
+        script.chmod(0o755)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Smoke test the daemon on a virtual deck")
+    parser.add_argument("--model", default="Stream Deck +", help="virtual deck model (default: Stream Deck +)")
+    parser.add_argument("--write-delay", type=float, default=0.0,
+                        help="seconds each simulated USB write takes (default: 0)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds to wait for each check")
+    parser.add_argument("--verbose", action="store_true", help="show the daemon's log")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL,
+                        format='%(asctime)s [%(levelname)s] %(message)s')
+
+    sdd = load_daemon()
+    failures = []
+
+    def check(name, ok, detail):
+        print(f"{'ok  ' if ok else 'FAIL'} {name}: {detail}")
+        if not ok:
+            failures.append(name)
+
+    with tempfile.TemporaryDirectory(prefix="streamdeck-smoke-") as tmp:
+        root = Path(tmp) / "actions"
+        markers = Path(tmp) / "markers"
+        markers.mkdir()
+        manager = sdd.VirtualDeviceManager([args.model], write_delay=args.write_delay)
+        deck = manager.decks[0]
+        key_count = sdd.DEVICE_PROFILES[args.model]['buttons']
+        make_actions(root, key_count, markers)
+
+        daemon = sdd.StreamDeckDaemon(deck.serial, root, device_manager=manager, use_disk_cache=False)
+        thread = threading.Thread(target=daemon.run, name="daemon", daemon=True)
+        thread.start()
+
+        try:
+            # Render: every key painted
+            elapsed = wait_for(lambda: len(deck.key_images) == key_count, args.timeout)
+            check("render", elapsed is not None,
+                  f"{len(deck.key_images)}/{key_count} keys"
+                  + (f" in {elapsed * 1000:.0f} ms" if elapsed is not None else ""))
+            expected = dict(deck.key_images)
+
+            # Input: taps run their scripts via the dispatcher
+            start = time.perf_counter()
+            for key in range(key_count):
+                deck.tap_key(key)
+            reader_time = time.perf_counter() - start
+            elapsed = wait_for(lambda: len(os.listdir(markers)) == key_count, args.timeout)
+            stats = daemon.dispatcher.stats()
+            check("input", elapsed is not None,
+                  f"{len(os.listdir(markers))}/{key_count} scripts ran, "
+                  f"callbacks {reader_time * 1000:.2f} ms, "
+                  f"dispatch avg {stats['avg_dispatch_ms']} ms max {stats['max_dispatch_ms']} ms")
+
+            # Reconnect: unplug, replug, same frames back without a reset
+            deck.unplug()
+            wait_for(lambda: not daemon.device_connected, args.timeout)
+            deck.key_images.clear()
+            deck.plug()
+            elapsed = wait_for(lambda: daemon.device_connected and deck.key_images == expected, args.timeout)
+            check("reconnect", elapsed is not None,
+                  f"restored in {elapsed * 1000:.0f} ms" if elapsed is not None
+                  else f"{len(deck.key_images)}/{key_count} keys restored")
+        finally:
+            daemon.running = False
+            daemon.hotplug_wakeup.set()
+            if daemon.watcher:
+                daemon.watcher.wake()
+            thread.join(timeout=5)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())